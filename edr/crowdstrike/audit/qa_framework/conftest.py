@@ -28,10 +28,30 @@ if 'config' not in sys.modules:
 # Now safe to import pytest and define fixtures
 # =============================================================================
 
+import copy
+
 import pytest
 
 
+# Data fixtures are session-scoped, so every test that requests one shares
+# the same instance. Treat them as read-only; a test that needs to modify
+# one should request it through the mutable_copy fixture instead.
+
+
 @pytest.fixture
+def mutable_copy(request):
+    """Deep-copy a shared data fixture for a test that modifies it.
+
+    Read-only tests request the session fixtures directly and pay for no
+    copies; a mutating test pays one deepcopy per fixture it copies:
+
+        alert = mutable_copy('sample_alert')
+        del alert['parent_details']
+    """
+    return lambda name: copy.deepcopy(request.getfixturevalue(name))
+
+
+@pytest.fixture(scope="session")
 def sample_alert():
     """A typical alert from the CrowdStrike API."""
     return {
@@ -59,7 +79,7 @@ def sample_alert():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def alert_with_ip():
     """Alert with IP addresses in the command line."""
     return {
@@ -75,7 +95,7 @@ def alert_with_ip():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def alert_with_guid():
     """Alert with GUID/UUID in the command line."""
     return {
@@ -91,7 +111,7 @@ def alert_with_guid():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def alert_with_well_known_sid():
     """Alert with well-known SID."""
     return {
@@ -107,7 +127,7 @@ def alert_with_well_known_sid():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def alert_minimal():
     """Minimal alert with sparse data."""
     return {
@@ -123,7 +143,7 @@ def alert_minimal():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def strong_tp_consensus():
     """Consensus result showing strong true_positive agreement."""
     return {
@@ -137,7 +157,7 @@ def strong_tp_consensus():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def strong_fp_consensus():
     """Consensus result showing strong false_positive agreement."""
     return {
@@ -151,7 +171,7 @@ def strong_fp_consensus():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def weak_consensus():
     """Consensus result with weak agreement."""
     return {
@@ -165,7 +185,7 @@ def weak_consensus():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def insufficient_data_consensus():
     """Consensus result with insufficient sample size."""
     return {
@@ -177,7 +197,7 @@ def insufficient_data_consensus():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def no_data_consensus():
     """Consensus result with no historical data."""
     return {
@@ -189,39 +209,43 @@ def no_data_consensus():
     }
 
 
-@pytest.fixture
+# Built once at import; tests that need to mutate should copy with dict(t).
+_SAMPLE_TEMPLATES = [
+    {
+        'hash': 'hash_001',
+        'template': 'pattern:50007|cmd:powershell.exe <DATA> bypass|file:powershell.exe|parent:cmd.exe',
+        'pattern_id': 50007
+    },
+    {
+        'hash': 'hash_002',
+        'template': 'pattern:50007|cmd:powershell.exe <DATA> hidden|file:powershell.exe|parent:cmd.exe',
+        'pattern_id': 50007
+    },
+    {
+        'hash': 'hash_003',
+        'template': 'pattern:50007|cmd:powershell.exe <DATA> bypass noprofile|file:powershell.exe|parent:explorer.exe',
+        'pattern_id': 50007
+    },
+    {
+        'hash': 'hash_004',
+        'template': 'pattern:50102|cmd:curl <IP> download|file:curl.exe|parent:bash',
+        'pattern_id': 50102
+    },
+    {
+        'hash': 'hash_005',
+        'template': 'pattern:50102|cmd:wget <IP> output|file:wget|parent:bash',
+        'pattern_id': 50102
+    },
+]
+
+
+@pytest.fixture(scope="session")
 def sample_templates():
     """Sample sanitized templates for similarity testing."""
-    return [
-        {
-            'hash': 'hash_001',
-            'template': 'pattern:50007|cmd:powershell.exe <DATA> bypass|file:powershell.exe|parent:cmd.exe',
-            'pattern_id': 50007
-        },
-        {
-            'hash': 'hash_002',
-            'template': 'pattern:50007|cmd:powershell.exe <DATA> hidden|file:powershell.exe|parent:cmd.exe',
-            'pattern_id': 50007
-        },
-        {
-            'hash': 'hash_003',
-            'template': 'pattern:50007|cmd:powershell.exe <DATA> bypass noprofile|file:powershell.exe|parent:explorer.exe',
-            'pattern_id': 50007
-        },
-        {
-            'hash': 'hash_004',
-            'template': 'pattern:50102|cmd:curl <IP> download|file:curl.exe|parent:bash',
-            'pattern_id': 50102
-        },
-        {
-            'hash': 'hash_005',
-            'template': 'pattern:50102|cmd:wget <IP> output|file:wget|parent:bash',
-            'pattern_id': 50102
-        },
-    ]
+    return _SAMPLE_TEMPLATES
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_api_response_query():
     """Mock response from query_alerts_v2."""
     return {
@@ -243,7 +267,19 @@ def mock_api_response_query():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def empty_query_response():
+    """Successful API response with no resources."""
+    return {
+        'status_code': 200,
+        'body': {
+            'resources': [],
+            'meta': {'pagination': {'total': 0}}
+        }
+    }
+
+
+@pytest.fixture(scope="session")
 def mock_api_response_details():
     """Mock response from get_alerts_v2."""
     return {
@@ -279,7 +315,7 @@ def mock_api_response_details():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_api_error_response():
     """Mock error response from API."""
     return {
@@ -292,4 +328,90 @@ def mock_api_error_response():
                 }
             ]
         }
-    }
\ No newline at end of file
+    }
+
+
+@pytest.fixture(scope="session")
+def sample_findings():
+    """Sample audit findings for report generation testing."""
+    return [
+        {
+            'alert_id': 'ldt:abc123:456',
+            'composite_id': 'abc123:ind:456',
+            'template_hash': 'hash123',
+            'display_name': 'Suspicious PowerShell Execution',
+            'description': 'PowerShell executed with encoded command',
+            'hostname': 'WORKSTATION-001',
+            'pattern_id': 50007,
+            'tactic': 'Execution',
+            'tactic_id': 'TA0002',
+            'technique': 'PowerShell',
+            'technique_id': 'T1059.001',
+            'severity_name': 'High',
+            'confidence': 85,
+            'severity': 'CRITICAL',
+            'reason': 'contradicts_consensus',
+            'new_resolution': 'false_positive',
+            'historical_resolution': 'true_positive',
+            'consensus_strength': 'strong',
+            'historical_ratio': 0.95,
+            'sample_size': 150,
+            'analyst': 'analyst@example.com',
+            'seconds_to_resolved': 3600,
+            'cmdline': 'powershell.exe -enc SGVsbG8=',
+            'filename': 'powershell.exe',
+            'filepath': 'C:\\Windows\\System32\\powershell.exe',
+            'parent_filename': 'cmd.exe',
+            'grandparent_filename': 'explorer.exe',
+            'user_name': 'jsmith',
+            'falcon_link': 'https://falcon.crowdstrike.com/activity/detections/detail/abc123',
+            'related_patterns': [
+                {
+                    'template_hash': 'hash456',
+                    'similarity': 0.85,
+                    'historical_consensus': 'true_positive',
+                    'sample_size': 50,
+                    'strength': 'strong',
+                    'differentiating_tokens': ['bypass', 'hidden'],
+                    'shared_tokens': ['powershell', 'enc'],
+                }
+            ],
+        },
+        {
+            'alert_id': 'ldt:def456:789',
+            'composite_id': 'def456:ind:789',
+            'template_hash': 'hash789',
+            'display_name': 'Suspicious Network Connection',
+            'hostname': 'SERVER-002',
+            'pattern_id': 50102,
+            'severity': 'INFO',
+            'reason': 'novel_pattern',
+            'new_resolution': 'true_positive',
+            'historical_resolution': None,
+            'sample_size': 0,
+            'analyst': 'analyst2@example.com',
+            'cmdline': 'curl http://example.com',
+            'filename': 'curl.exe',
+            'falcon_link': 'https://falcon.crowdstrike.com/activity/detections/detail/def456',
+            'related_patterns': [],
+        },
+    ]
+
+
+@pytest.fixture(scope="session")
+def sample_stats():
+    """Sample run statistics for report generation testing."""
+    return {
+        'total_processed': 100,
+        'matches_consensus': 85,
+        'contradictions': 10,
+        'novel_patterns': 5,
+        'insufficient_data': 0,
+        'by_severity': {
+            'CRITICAL': 2,
+            'HIGH': 3,
+            'MEDIUM': 3,
+            'LOW': 2,
+            'INFO': 5,
+        },
+    }
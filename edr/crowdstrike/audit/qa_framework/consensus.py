@@ -12,7 +12,80 @@ consensus" from sparse data (e.g., 9/10 is not as reliable as 900/1000).
 """
 
 from collections import Counter
-from scipy import stats
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+from math import sqrt
+from statistics import NormalDist
+
+try:
+    # Optional vectorized backend for batched Wilson intervals and encoded
+    # resolution tallies; falls back to pure Python
+    import numpy as _np
+except ImportError:
+    _np = None
+
+
+@lru_cache(maxsize=None)
+def _z_score(confidence: float) -> float:
+    """Two-sided standard normal critical value for a confidence level.
+    
+    Cached so the inverse CDF is evaluated once per confidence level rather
+    than on every interval calculation (1.959963984540054 for 0.95).
+    """
+    return NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+
+
+# Fixed strength boundaries: a strong consensus also needs its Wilson lower
+# bound at or above _STRONG_CI_FLOOR; below strong_threshold, a majority of at
+# least _MODERATE_THRESHOLD is moderate and anything less is weak
+_STRONG_CI_FLOOR = 0.70
+_MODERATE_THRESHOLD = 0.80
+
+
+# Resolution categories in code order for encode_resolutions()
+_RESOLUTIONS = ('true_positive', 'false_positive', 'ignored')
+_RESOLUTION_CODES = {r: code for code, r in enumerate(_RESOLUTIONS)}
+
+
+def encode_resolutions(resolutions: Iterable[str]):
+    """Encode resolution strings as one-byte category codes.
+    
+    None/empty resolutions are dropped, matching calculate_consensus().
+    The result can be passed to ConsensusCalculator.calculate_consensus_from_codes
+    and is roughly 8x smaller than the list of strings.
+    
+    Args:
+        resolutions: Resolution strings (true_positive, false_positive,
+            ignored)
+            
+    Returns:
+        An int8 NumPy array when NumPy is installed, bytes otherwise
+        
+    Raises:
+        KeyError: If a resolution is not one of the known categories
+    """
+    codes = (_RESOLUTION_CODES[r] for r in resolutions if r)
+    if _np is None:
+        return bytes(codes)
+    return _np.fromiter(codes, dtype=_np.int8)
+
+
+# Non-consensus status -> INFO reason; unknown statuses are reported as-is
+_INFO_REASONS = {
+    'no_data': 'novel_pattern',
+    'insufficient_data': 'insufficient_historical_data',
+}
+
+
+# (historical, new) resolution -> (severity, reason) for contradictions of a
+# strong or moderate consensus; other pairs are LOW 'other_contradiction'
+_CONFIDENT_CONTRADICTIONS = {
+    ('true_positive', 'false_positive'): ('CRITICAL', 'fp_contradicts_strong_tp_consensus'),
+    ('false_positive', 'true_positive'): ('HIGH', 'tp_contradicts_strong_fp_consensus'),
+    ('true_positive', 'ignored'): ('MEDIUM', 'ignored_contradicts_strong_tp_consensus'),
+    ('ignored', 'true_positive'): ('LOW', 'tp_contradicts_ignored_consensus'),
+}
+
 
 class ConsensusCalculator:
     """
@@ -51,9 +124,83 @@ class ConsensusCalculator:
             - sample_size: Total number of resolutions
             - strength: 'strong', 'moderate', or 'weak'
         """
-        # Filter out None/empty resolutions
-        valid_resolutions = [r for r in resolutions if r]
-        n = len(valid_resolutions)
+        # Filter out None/empty resolutions and tally in a single C-level pass
+        return self._consensus_from_counts(Counter(filter(None, resolutions)))
+    
+    def calculate_consensus_batch(
+        self,
+        resolution_groups: Iterable[Iterable[str]]
+    ) -> list[dict]:
+        """Calculate consensus for many independent resolution lists.
+        
+        Equivalent to calling calculate_consensus() on each group, but the
+        Wilson intervals for every group with enough samples are computed in
+        one vectorized pass.
+        
+        Args:
+            resolution_groups: One list of resolution strings per baseline
+                
+        Returns:
+            List of consensus dicts, in the same order as resolution_groups
+        """
+        tallies = [Counter(filter(None, group)) for group in resolution_groups]
+        sizes = [sum(counts.values()) for counts in tallies]
+        
+        eligible = [
+            i for i, n in enumerate(sizes)
+            if n > 0 and n >= self.min_samples
+        ]
+        lows, highs = self._wilson_interval_batch(
+            [tallies[i].most_common(1)[0][1] for i in eligible],
+            [sizes[i] for i in eligible]
+        )
+        intervals = dict(zip(eligible, zip(lows, highs)))
+        
+        return [
+            self._consensus_from_counts(counts, intervals.get(i))
+            for i, counts in enumerate(tallies)
+        ]
+    
+    def calculate_consensus_from_codes(self, codes) -> dict:
+        """Calculate consensus from encoded resolutions.
+        
+        Equivalent to calculate_consensus() on the original strings, but
+        tallies with np.bincount (or bytes.count without NumPy) instead of
+        hashing each string. Ties between equally common resolutions go
+        to the one that occurs first, as in calculate_consensus().
+        
+        Args:
+            codes: Output of encode_resolutions()
+            
+        Returns:
+            Same dict as calculate_consensus()
+        """
+        if _np is None:
+            tallies = [codes.count(code) for code in range(len(_RESOLUTIONS))]
+            present = [code for code, count in enumerate(tallies) if count]
+            first_seen = {code: codes.index(code) for code in present}
+        else:
+            tallies = _np.bincount(codes, minlength=len(_RESOLUTIONS)).tolist()
+            present = [code for code, count in enumerate(tallies) if count]
+            first_seen = {code: int(_np.argmax(codes == code)) for code in present}
+        
+        # Insert in first-occurrence order so ties break the same way as
+        # calculate_consensus(), whose Counter sees the strings in order
+        return self._consensus_from_counts(Counter(
+            {_RESOLUTIONS[code]: tallies[code] for code in sorted(present, key=first_seen.get)}
+        ))
+    
+    def _consensus_from_counts(
+        self,
+        counts: Counter,
+        interval: tuple[float, float] | None = None
+    ) -> dict:
+        """Build the consensus result from per-resolution counts.
+        
+        interval is a precomputed Wilson interval for the majority count;
+        it is calculated here when not supplied.
+        """
+        n = sum(counts.values())
         
         if n == 0:
             return {
@@ -66,7 +213,6 @@ class ConsensusCalculator:
         
         if n < self.min_samples:
             # Still provide the data, but mark as insufficient
-            counts = Counter(valid_resolutions)
             majority_resolution, majority_count = counts.most_common(1)[0]
             return {
                 'status': 'insufficient_data',
@@ -77,17 +223,18 @@ class ConsensusCalculator:
             }
         
         # Calculate majority
-        counts = Counter(valid_resolutions)
         majority_resolution, majority_count = counts.most_common(1)[0]
         ratio = majority_count / n
         
         # Calculate Wilson confidence interval
-        ci_low, ci_high = self._wilson_interval(majority_count, n)
+        if interval is None:
+            interval = self._wilson_interval(majority_count, n)
+        ci_low, ci_high = float(interval[0]), float(interval[1])
         
         # Determine strength
-        if ratio >= self.strong_threshold and ci_low >= 0.70:
+        if ratio >= self.strong_threshold and ci_low >= _STRONG_CI_FLOOR:
             strength = 'strong'
-        elif ratio >= 0.80:
+        elif ratio >= _MODERATE_THRESHOLD:
             strength = 'moderate'
         else:
             strength = 'weak'
@@ -127,18 +274,84 @@ class ConsensusCalculator:
         if n == 0:
             return (0.0, 0.0)
         
-        z = stats.norm.ppf(1 - (1 - confidence) / 2)
-        p = successes / n
+        z = _z_score(confidence)
+        z2 = z * z
+        
+        # At unanimous (or zero) agreement the +/- term collapses: the
+        # interval is exactly [n/(n+z^2), 1] (or [0, z^2/(n+z^2)])
+        if successes == n:
+            return (n / (n + z2), 1.0)
+        if successes == 0:
+            return (0.0, z2 / (n + z2))
         
-        denominator = 1 + z**2 / n
-        center = (p + z**2 / (2 * n)) / denominator
-        spread = z * ((p * (1 - p) / n + z**2 / (4 * n**2)) ** 0.5) / denominator
+        # Wilson bounds multiplied through by n:
+        #   (x + z^2/2 +/- z*sqrt(x(n-x)/n + z^2/4)) / (n + z^2)
+        # which needs a single division for the shared denominator
+        inv_denominator = 1 / (n + z2)
+        center = (successes + z2 / 2) * inv_denominator
+        spread = z * sqrt(successes * (n - successes) / n + z2 / 4) * inv_denominator
         
         ci_low = float(max(0, center - spread))
         ci_high = float(min(1, center + spread))
 
         return (ci_low, ci_high)
     
+    def _wilson_interval_batch(
+        self,
+        successes: Sequence[int],
+        n: Sequence[int],
+        confidence: float = 0.95
+    ) -> tuple[Sequence[float], Sequence[float]]:
+        """Calculate Wilson score intervals for many (successes, n) pairs.
+        
+        Element-wise equivalent to _wilson_interval, computed in a single
+        vectorized pass when NumPy is available.
+        
+        Args:
+            successes: Majority counts, one per sample
+            n: Sample sizes, aligned with successes
+            confidence: Confidence level (default 0.95 for 95% CI)
+            
+        Returns:
+            Tuple of (lower_bounds, upper_bounds); NumPy arrays when NumPy
+            is installed, lists of floats otherwise
+        """
+        if _np is None:
+            intervals = [
+                self._wilson_interval(x, size, confidence)
+                for x, size in zip(successes, n)
+            ]
+            return [lo for lo, _ in intervals], [hi for _, hi in intervals]
+        
+        x = _np.asarray(successes, dtype=float)
+        size = _np.asarray(n, dtype=float)
+        empty = size == 0
+        # Keep n == 0 rows out of the divisions; they are zeroed below
+        size = _np.where(empty, 1.0, size)
+        
+        z = _z_score(confidence)
+        z2 = z * z
+        # Same rearrangement as _wilson_interval
+        inv_denominator = 1 / (size + z2)
+        center = (x + z2 / 2) * inv_denominator
+        spread = z * _np.sqrt(x * (size - x) / size + z2 / 4) * inv_denominator
+        
+        ci_low = _np.clip(center - spread, 0.0, 1.0)
+        ci_high = _np.clip(center + spread, 0.0, 1.0)
+        
+        # Same closed forms as _wilson_interval at 0/n and n/n
+        unanimous = x == size
+        ci_low = _np.where(unanimous, size / (size + z2), ci_low)
+        ci_high = _np.where(unanimous, 1.0, ci_high)
+        zero = x == 0
+        ci_low = _np.where(zero, 0.0, ci_low)
+        ci_high = _np.where(zero, z2 / (size + z2), ci_high)
+        
+        ci_low = _np.where(empty, 0.0, ci_low)
+        ci_high = _np.where(empty, 0.0, ci_high)
+        
+        return ci_low, ci_high
+    
     def detect_contradiction(
         self, 
         new_resolution: str, 
@@ -166,25 +379,11 @@ class ConsensusCalculator:
         status = consensus.get('status', 'no_data')
         
         # Handle non-consensus cases
-        if status == 'no_data':
-            return {
-                'is_contradiction': False,
-                'severity': 'INFO',
-                'reason': 'novel_pattern'
-            }
-        
-        if status == 'insufficient_data':
-            return {
-                'is_contradiction': False,
-                'severity': 'INFO',
-                'reason': 'insufficient_historical_data'
-            }
-        
         if status != 'consensus':
             return {
                 'is_contradiction': False,
                 'severity': 'INFO',
-                'reason': status
+                'reason': _INFO_REASONS.get(status, status)
             }
         
         historical = consensus['majority_resolution']
@@ -202,21 +401,9 @@ class ConsensusCalculator:
         
         if strength in ('strong', 'moderate'):
             # High-confidence contradictions
-            if historical == 'true_positive' and new_resolution == 'false_positive':
-                severity = 'CRITICAL'
-                reason = 'fp_contradicts_strong_tp_consensus'
-            elif historical == 'false_positive' and new_resolution == 'true_positive':
-                severity = 'HIGH'
-                reason = 'tp_contradicts_strong_fp_consensus'
-            elif historical == 'true_positive' and new_resolution == 'ignored':
-                severity = 'MEDIUM'
-                reason = 'ignored_contradicts_strong_tp_consensus'
-            elif historical == 'ignored' and new_resolution == 'true_positive':
-                severity = 'LOW'
-                reason = 'tp_contradicts_ignored_consensus'
-            else:
-                severity = 'LOW'
-                reason = 'other_contradiction'
+            severity, reason = _CONFIDENT_CONTRADICTIONS.get(
+                (historical, new_resolution), ('LOW', 'other_contradiction')
+            )
         else:
             # Weak consensus - all contradictions are LOW
             severity = 'LOW'
@@ -231,4 +418,34 @@ class ConsensusCalculator:
             'consensus_strength': strength,
             'sample_size': consensus.get('sample_size', 0),
             'historical_ratio': consensus.get('ratio')
-        }
\ No newline at end of file
+        }
+
+
+class IncrementalConsensus(ConsensusCalculator):
+    """
+    Consensus over a baseline that grows one resolution at a time.
+    
+    Keeps per-resolution counts as running state, so adding a resolution is
+    O(1) and snapshot() never re-scans history.
+    
+    Example:
+        >>> baseline = IncrementalConsensus(min_samples=20)
+        >>> for resolution in ['true_positive'] * 45 + ['false_positive'] * 5:
+        ...     baseline.update(resolution)
+        >>> baseline.snapshot()['strength']
+        'strong'
+    """
+
+    def __init__(self, min_samples: int = 20, strong_threshold: float = 0.90):
+        super().__init__(min_samples, strong_threshold)
+        self._counts: Counter = Counter()
+
+    def update(self, resolution: str) -> None:
+        """Add one resolution to the baseline; None/empty values are ignored."""
+        if resolution:
+            self._counts[resolution] += 1
+
+    def snapshot(self) -> dict:
+        """Return the current consensus, same as calculate_consensus() on
+        every resolution added so far."""
+        return self._consensus_from_counts(self._counts)
@@ -77,13 +77,13 @@ def run_qa_pipeline() -> int:
     
     processed_alerts = []
     
-    for alert in daily_alerts:
+    # Generate behavioral templates
+    templates = [Sanitizer.generate_template(alert) for alert in daily_alerts]
+    template_hashes = Sanitizer.hash_templates(templates)
+    
+    for alert, template, template_hash in zip(daily_alerts, templates, template_hashes):
         fields = extract_qa_fields(alert)
         
-        # Generate behavioral template
-        template = Sanitizer.generate_template(alert)
-        template_hash = Sanitizer.hash_template(template)
-        
         fields['template'] = template
         fields['template_hash'] = template_hash
         
@@ -130,9 +130,10 @@ def run_qa_pipeline() -> int:
     # Group historical resolutions by template hash
     resolution_groups: dict[str, list[str]] = {}
     
-    for alert in historical_alerts:
-        template = Sanitizer.generate_template(alert)
-        template_hash = Sanitizer.hash_template(template)
+    historical_templates = [Sanitizer.generate_template(alert) for alert in historical_alerts]
+    historical_hashes = Sanitizer.hash_templates(historical_templates)
+    
+    for alert, template, template_hash in zip(historical_alerts, historical_templates, historical_hashes):
         resolution = alert.get('resolution')
         pattern_id = alert.get('pattern_id')
         
@@ -151,10 +152,10 @@ def run_qa_pipeline() -> int:
         similarity_analyzer.index_template(template_hash, template, pattern_id)
     
     # Calculate consensus for each template
-    consensus_lookup: dict[str, dict] = {}
-    
-    for template_hash, resolutions in resolution_groups.items():
-        consensus_lookup[template_hash] = calculator.calculate_consensus(resolutions)
+    consensus_lookup: dict[str, dict] = dict(zip(
+        resolution_groups,
+        calculator.calculate_consensus_batch(resolution_groups.values())
+    ))
     
     logger.info(
         f"Built consensus for {len(consensus_lookup)} unique templates "
@@ -13,12 +13,20 @@ need to make decisions. The JSON report includes all fields for
 archival and automation purposes.
 """
 
+import heapq
 import html
 import json
+import os
 import pathlib
+import re
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from typing import Any
 
+# Characters that require HTML escaping
+_UNSAFE_HTML_RE = re.compile(r'[&<>"\']')
+
 
 def generate_reports(
     findings: list[dict],
@@ -38,47 +46,77 @@ def generate_reports(
     Returns:
         Dict mapping format name to output file path
     """
-    output_dir.mkdir(exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
     
+    # Read the clock once so the filename and generated_at agree
+    now = datetime.now()
+    generated_at = now.isoformat()
     if timestamp is None:
-        timestamp = datetime.now().strftime('%Y-%m-%d')
+        timestamp = now.strftime('%Y-%m-%d')
     
     # Sort findings by severity
-    severity_order = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3, 'INFO': 4}
-    sorted_findings = sorted(
-        findings, 
-        key=lambda f: severity_order.get(f.get('severity', 'INFO'), 5)
-    )
+    sorted_findings = _sort_by_severity(findings)
     
-    output_paths = {}
+    json_path = output_dir / f"{timestamp}_qa_findings.json"
+    html_path = output_dir / f"{timestamp}_qa_findings.html"
     
     # Generate JSON report (all fields)
-    json_path = output_dir / f"{timestamp}_qa_findings.json"
-    _write_json_report(sorted_findings, stats, json_path)
-    output_paths['json'] = json_path
+    _write_json_report(sorted_findings, stats, json_path, generated_at)
     
     # Generate HTML report (curated fields, formatted for humans)
-    html_path = output_dir / f"{timestamp}_qa_findings.html"
     _write_html_report(sorted_findings, stats, html_path, timestamp)
-    output_paths['html'] = html_path
     
-    return output_paths
+    return {
+        'json': json_path,
+        'html': html_path,
+    }
+
+
+def _sort_by_severity(findings: list[dict]) -> list[dict]:
+    """
+    Order findings CRITICAL first, keeping input order within a severity.
+    
+    There are only five severities, so findings are bucketed in one pass
+    instead of comparison-sorted. Findings with an unrecognized severity
+    go last; a missing severity counts as INFO.
+    """
+    buckets: dict[str, list[dict]] = {severity: [] for severity in _SEVERITIES}
+    unranked: list[dict] = []
+    
+    for finding in findings:
+        buckets.get(finding.get('severity', 'INFO'), unranked).append(finding)
+    
+    sorted_findings = [f for severity in _SEVERITIES for f in buckets[severity]]
+    sorted_findings.extend(unranked)
+    return sorted_findings
 
 
 def _write_json_report(
     findings: list[dict], 
     stats: dict, 
-    output_path: pathlib.Path
+    output_path: pathlib.Path,
+    generated_at: str,
 ) -> None:
-    """Write complete findings to JSON file."""
-    report = {
-        'generated_at': datetime.now().isoformat(),
-        'summary': stats,
-        'findings': findings,
-    }
+    """
+    Write complete findings to JSON file.
     
+    The envelope is written by hand and each finding is encoded and
+    written on its own line, so only one encoded finding is held in
+    memory at a time regardless of report size.
+    """
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2, default=str)
+        f.write('{\n')
+        f.write(f'  "generated_at": {json.dumps(generated_at)},\n')
+        f.write(f'  "summary": {json.dumps(stats, default=str)},\n')
+        f.write('  "findings": [')
+        
+        separator = '\n    '
+        for finding in findings:
+            f.write(separator)
+            f.write(json.dumps(finding, default=str))
+            separator = ',\n    '
+        
+        f.write('\n  ]\n}\n' if findings else ']\n}\n')
 
 
 def _write_html_report(
@@ -90,8 +128,31 @@ def _write_html_report(
     """Write formatted HTML report."""
     html_content = _build_html_report(findings, stats, timestamp)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    # The page is already fully built, so encode once and write it
+    # straight to the file descriptor rather than through a buffered stream
+    _write_bytes(output_path, html_content.encode('utf-8'))
+
+
+def _write_bytes(output_path: pathlib.Path, payload: bytes) -> None:
+    """Write a complete payload to a file with unbuffered os-level calls."""
+    # O_BINARY (Windows only) stops newline translation
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(output_path, flags, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            # os.write may write fewer bytes than requested
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+_NO_FINDINGS_HTML = """
+        <div class="no-findings">
+            <p>No findings to report. All alerts match consensus or are novel patterns.</p>
+        </div>
+        """
 
 
 def _build_html_report(
@@ -102,16 +163,10 @@ def _build_html_report(
     """Build the complete HTML report string."""
     
     # Build findings HTML
-    findings_html = ""
-    for finding in findings:
-        findings_html += _build_finding_card(finding)
-    
-    if not findings_html:
-        findings_html = """
-        <div class="no-findings">
-            <p>No findings to report. All alerts match consensus or are novel patterns.</p>
-        </div>
-        """
+    if findings:
+        findings_html = ''.join(_build_finding_card(finding) for finding in findings)
+    else:
+        findings_html = _NO_FINDINGS_HTML
     
     # Build analyst summary table
     analyst_summary = _build_analyst_summary(findings)
@@ -181,22 +236,65 @@ def _build_html_report(
 </html>"""
 
 
+def _escape(text: str) -> str:
+    """
+    HTML-escape user-controlled content.
+    
+    Most hostnames, analyst names and file names contain nothing to
+    escape and are returned unchanged.
+    """
+    if not _UNSAFE_HTML_RE.search(text):
+        return text
+    return html.escape(text)
+
+
+@dataclass(slots=True)
+class FindingView:
+    """
+    Escaped, display-ready text fields of a finding.
+    
+    Missing values are normalized once when the view is built, so the
+    card builder reads plain attributes instead of repeating the
+    get/or/str/escape chain for every field.
+    """
+    hostname: str
+    display_name: str
+    description: str
+    analyst: str
+    cmdline: str
+    filename: str
+    parent_filename: str
+    grandparent_filename: str
+    user_name: str
+    filepath: str
+    disposition_desc: str
+    
+    @classmethod
+    def from_dict(cls, finding: dict) -> 'FindingView':
+        """Build a view from a finding dict, escaping every field."""
+        get = finding.get
+        return cls(
+            hostname=_escape(str(get('hostname') or 'Unknown')),
+            display_name=_escape(str(get('display_name') or f"Pattern {get('pattern_id', 'Unknown')}")),
+            description=_escape(str(get('description') or '')),
+            analyst=_escape(str(get('analyst') or 'Unknown')),
+            cmdline=_escape(str(get('cmdline') or '')),
+            filename=_escape(str(get('filename') or '')),
+            parent_filename=_escape(str(get('parent_filename') or '')),
+            grandparent_filename=_escape(str(get('grandparent_filename') or '')),
+            user_name=_escape(str(get('user_name') or '')),
+            filepath=_escape(str(get('filepath') or '')),
+            disposition_desc=_escape(str(get('pattern_disposition_description') or '')),
+        )
+
+
 def _build_finding_card(finding: dict) -> str:
     """Build HTML for a single finding card."""
     severity = finding.get('severity', 'INFO')
     severity_class = severity.lower()
     
     # Escape user-controlled content
-    hostname = html.escape(str(finding.get('hostname') or 'Unknown'))
-    display_name = html.escape(str(finding.get('display_name') or f"Pattern {finding.get('pattern_id', 'Unknown')}"))
-    description = html.escape(str(finding.get('description') or ''))
-    analyst = html.escape(str(finding.get('analyst') or 'Unknown'))
-    cmdline = html.escape(str(finding.get('cmdline') or ''))
-    filename = html.escape(str(finding.get('filename') or ''))
-    parent_filename = html.escape(str(finding.get('parent_filename') or ''))
-    grandparent_filename = html.escape(str(finding.get('grandparent_filename') or ''))
-    user_name = html.escape(str(finding.get('user_name') or ''))
-    filepath = html.escape(str(finding.get('filepath') or ''))
+    view = FindingView.from_dict(finding)
     
     # Resolution comparison
     new_res = finding.get('new_resolution') or 'None'
@@ -223,18 +321,28 @@ def _build_finding_card(finding: dict) -> str:
     seconds_to_resolved = finding.get('seconds_to_resolved')
     time_display = _format_duration(seconds_to_resolved) if seconds_to_resolved else ''
     
-    # Sensor action
-    disposition_desc = html.escape(str(finding.get('pattern_disposition_description') or ''))
-    
     # Falcon link
     falcon_link = finding.get('falcon_link') or ''
     
+    # Optional context rows, skipped when empty
+    context_fields = (
+        ('CrowdStrike', cs_display),
+        ('Sensor Action', view.disposition_desc),
+        ('User', view.user_name),
+        ('Path', f'<code>{view.filepath}</code>' if view.filepath else ''),
+    )
+    context_html = ''.join(
+        f'<div class="context-item"><span class="label">{label}:</span> {value}</div>'
+        for label, value in context_fields
+        if value
+    )
+    
     # Process chain
     process_chain = _build_process_chain(
-        grandparent_filename, 
-        parent_filename, 
-        filename, 
-        cmdline
+        view.grandparent_filename, 
+        view.parent_filename, 
+        view.filename, 
+        view.cmdline
     )
     
     # Related patterns
@@ -244,19 +352,16 @@ def _build_finding_card(finding: dict) -> str:
         <div class="finding-card severity-{severity_class}">
             <div class="finding-header">
                 <span class="severity-badge {severity_class}">{severity}</span>
-                <span class="detection-name">{display_name}</span>
-                <span class="hostname">{hostname}</span>
+                <span class="detection-name">{view.display_name}</span>
+                <span class="hostname">{view.hostname}</span>
             </div>
             
-            {f'<div class="description">{description}</div>' if description else ''}
+            {f'<div class="description">{view.description}</div>' if view.description else ''}
             
             <div class="finding-body">
                 <div class="context-section">
                     {mitre_html}
-                    {f'<div class="context-item"><span class="label">CrowdStrike:</span> {cs_display}</div>' if cs_display else ''}
-                    {f'<div class="context-item"><span class="label">Sensor Action:</span> {disposition_desc}</div>' if disposition_desc else ''}
-                    {f'<div class="context-item"><span class="label">User:</span> {user_name}</div>' if user_name else ''}
-                    {f'<div class="context-item"><span class="label">Path:</span> <code>{filepath}</code></div>' if filepath else ''}
+                    {context_html}
                 </div>
                 
                 <div class="contradiction-section">
@@ -281,7 +386,7 @@ def _build_finding_card(finding: dict) -> str:
                 </div>
                 
                 <div class="analyst-section">
-                    <span class="analyst-name">{analyst}</span>
+                    <span class="analyst-name">{view.analyst}</span>
                     {f'<span class="resolution-time">Resolved in {time_display}</span>' if time_display else ''}
                 </div>
                 
@@ -327,14 +432,40 @@ def _build_mitre_section(mitre_attack: list[dict], finding: dict) -> str:
         # -------------------------------------------------------------------------
         return ''
     
+    # Findings from the same detection share their MITRE entries, so the
+    # rendered HTML is cached on the entry values
+    entries_key = tuple(
+        (
+            entry.get('tactic'),
+            entry.get('tactic_id'),
+            entry.get('technique'),
+            entry.get('technique_id'),
+            entry.get('pattern_id'),
+        )
+        for entry in mitre_attack
+    )
+    return _render_mitre_entries(entries_key)
+
+
+@lru_cache(maxsize=4096)
+def _render_mitre_entries(entries_key: tuple[tuple, ...]) -> str:
+    """
+    Render MITRE ATT&CK entries as HTML.
+    
+    Args:
+        entries_key: Tuple of (tactic, tactic_id, technique, technique_id,
+            pattern_id) tuples, one per MITRE entry
+        
+    Returns:
+        HTML string for the MITRE section
+    """
     # Format each MITRE entry
     entries = []
-    for entry in mitre_attack:
-        tactic = html.escape(str(entry.get('tactic') or ''))
-        tactic_id = html.escape(str(entry.get('tactic_id') or ''))
-        technique = html.escape(str(entry.get('technique') or ''))
-        technique_id = html.escape(str(entry.get('technique_id') or ''))
-        pattern_id = entry.get('pattern_id')
+    for raw_tactic, raw_tactic_id, raw_technique, raw_technique_id, pattern_id in entries_key:
+        tactic = _escape(str(raw_tactic or ''))
+        tactic_id = _escape(str(raw_tactic_id or ''))
+        technique = _escape(str(raw_technique or ''))
+        technique_id = _escape(str(raw_technique_id or ''))
         
         # Build technique display with ID
         technique_display = f"{technique} ({technique_id})" if technique_id else technique
@@ -429,8 +560,8 @@ def _build_related_patterns(related_patterns: list[dict]) -> str:
         diff_tokens = rp.get('differentiating_tokens', [])
         shared_tokens = rp.get('shared_tokens', [])
         
-        diff_html = ', '.join(f'<code>{html.escape(t)}</code>' for t in diff_tokens[:5]) if diff_tokens else '<em>None</em>'
-        shared_html = ', '.join(f'<code>{html.escape(t)}</code>' for t in shared_tokens[:5]) if shared_tokens else '<em>None</em>'
+        diff_html = ', '.join(f'<code>{_escape(t)}</code>' for t in diff_tokens[:5]) if diff_tokens else '<em>None</em>'
+        shared_html = ', '.join(f'<code>{_escape(t)}</code>' for t in shared_tokens[:5]) if shared_tokens else '<em>None</em>'
         
         patterns_html += f"""
             <div class="related-pattern">
@@ -482,18 +613,19 @@ def _build_analyst_summary(findings: list[dict]) -> str:
     if not analyst_counts:
         return ""
     
-    # Sort by total contradictions descending
-    sorted_analysts = sorted(
-        analyst_counts.items(), 
-        key=lambda x: x[1]['total'], 
-        reverse=True
+    # Top 10 by total contradictions; nlargest keeps ties in first-seen
+    # order, like a stable descending sort, without sorting every analyst
+    top_analysts = heapq.nlargest(
+        10,
+        analyst_counts.items(),
+        key=lambda x: x[1]['total']
     )
     
     rows_html = ""
-    for analyst, counts in sorted_analysts[:10]:  # Top 10
+    for analyst, counts in top_analysts:
         rows_html += f"""
             <tr>
-                <td>{html.escape(analyst)}</td>
+                <td>{_escape(analyst)}</td>
                 <td class="critical-count">{counts['CRITICAL']}</td>
                 <td class="high-count">{counts['HIGH']}</td>
                 <td class="medium-count">{counts['MEDIUM']}</td>
@@ -524,41 +656,47 @@ def _build_analyst_summary(findings: list[dict]) -> str:
     """
 
 
-def _build_severity_bars(by_severity: dict) -> str:
-    """Build the severity breakdown visualization."""
-    total = sum(by_severity.values()) or 1
-    
-    bars_html = ""
-    for severity in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFO']:
-        count = by_severity.get(severity, 0)
-        pct = (count / total) * 100
-        
-        bars_html += f"""
+_SEVERITIES = ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFO')
+
+_SEVERITY_BAR_TEMPLATE = """
             <div class="severity-row">
-                <span class="severity-label {severity.lower()}">{severity}</span>
+                <span class="severity-label {css}">{severity}</span>
                 <div class="severity-bar-container">
-                    <div class="severity-bar {severity.lower()}" style="width: {pct}%"></div>
+                    <div class="severity-bar {css}" style="width: {pct}%"></div>
                 </div>
                 <span class="severity-count">{count}</span>
             </div>
         """
-    
-    return bars_html
 
 
-def _format_resolution(resolution: str | None) -> str:
-    """Format resolution value for display."""
-    if not resolution or resolution == 'None':
-        return '<span class="res-none">None</span>'
-    
-    resolution_lower = resolution.lower().replace('_', ' ')
-    
-    css_class = {
-        'true positive': 'res-tp',
-        'false positive': 'res-fp',
-        'ignored': 'res-ignored',
-    }.get(resolution_lower, '')
+def _build_severity_bars(by_severity: dict) -> str:
+    """Build the severity breakdown visualization."""
+    counts = [by_severity.get(severity, 0) for severity in _SEVERITIES]
+    total = sum(by_severity.values()) or 1
     
+    return ''.join(
+        _SEVERITY_BAR_TEMPLATE.format(
+            severity=severity,
+            css=severity.lower(),
+            pct=(count / total) * 100,
+            count=count,
+        )
+        for severity, count in zip(_SEVERITIES, counts)
+    )
+
+
+_NO_RESOLUTION_HTML = '<span class="res-none">None</span>'
+
+_RESOLUTION_CSS = {
+    'true positive': 'res-tp',
+    'false positive': 'res-fp',
+    'ignored': 'res-ignored',
+}
+
+
+def _render_resolution(resolution: str) -> str:
+    """Render a resolution value as (optionally styled) display text."""
+    css_class = _RESOLUTION_CSS.get(resolution.lower().replace('_', ' '), '')
     display = resolution.replace('_', ' ').title()
     
     if css_class:
@@ -566,6 +704,28 @@ def _format_resolution(resolution: str | None) -> str:
     return display
 
 
+# Pre-rendered output for the resolution values the Falcon API returns
+_RESOLUTION_HTML = {
+    resolution: _render_resolution(resolution)
+    for resolution in (
+        'true_positive', 'false_positive', 'ignored',
+        'TRUE_POSITIVE', 'FALSE_POSITIVE', 'IGNORED',
+    )
+}
+
+
+def _format_resolution(resolution: str | None) -> str:
+    """Format resolution value for display."""
+    if not resolution or resolution == 'None':
+        return _NO_RESOLUTION_HTML
+    
+    rendered = _RESOLUTION_HTML.get(resolution)
+    if rendered is None:
+        rendered = _render_resolution(resolution)
+    return rendered
+
+
+@lru_cache(maxsize=512)
 def _format_duration(seconds: int | None) -> str:
     """Format seconds into human-readable duration."""
     if seconds is None:
@@ -573,17 +733,16 @@ def _format_duration(seconds: int | None) -> str:
     
     if seconds < 60:
         return f"{seconds}s"
-    elif seconds < 3600:
-        minutes = seconds // 60
-        return f"{minutes}m"
-    elif seconds < 86400:
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    if seconds < 86400:
+        hours, remainder = divmod(seconds, 3600)
+        minutes = remainder // 60
         return f"{hours}h {minutes}m" if minutes else f"{hours}h"
-    else:
-        days = seconds // 86400
-        hours = (seconds % 86400) // 3600
-        return f"{days}d {hours}h" if hours else f"{days}d"
+    
+    days, remainder = divmod(seconds, 86400)
+    hours = remainder // 3600
+    return f"{days}d {hours}h" if hours else f"{days}d"
 
 
 def _get_css() -> str:
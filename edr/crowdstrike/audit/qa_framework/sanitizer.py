@@ -1,7 +1,40 @@
 # sanitizer.py
 
+import os
 import re
 import hashlib
+from collections.abc import Iterable
+from functools import lru_cache
+from types import MappingProxyType
+
+# Shared read-only stand-in for missing nested alert dicts
+_EMPTY = MappingProxyType({})
+
+# Entries kept by the sanitize() and template caches; lower it through the
+# environment for memory-sensitive deployments
+_CACHE_SIZE = int(os.environ.get('QA_SANITIZER_CACHE_SIZE', 8192))
+
+_DIGITS = frozenset('0123456789')
+
+# What a rule needs before it can match, keyed by description: one
+# character from each set, and a minimum text length. sanitize() skips
+# rules whose prerequisites a text does not meet.
+_RULE_PREREQUISITES = {
+    'IPv4 Address': ((frozenset('.'), _DIGITS), 7),
+    'IPv6 Address': ((frozenset(':'),), 15),
+    'GUIDs/UUIDs/CLSIDs': ((frozenset('-'),), 36),
+    'Windows temp file path': ((frozenset(':'), frozenset('\\')), 9),
+    'Linux temp file path': ((frozenset('/'),), 6),
+    'URL hostname': ((frozenset(':'), frozenset('/')), 11),
+    'ISO timestamp': ((frozenset(':'), _DIGITS), 19),
+    'Unix timestamp': ((frozenset('1'),), 10),
+    'Base64-encoded data': ((), 20),
+    'Hex string (hash or encoded data)': ((), 32),
+    'Domain user/computer SID': ((frozenset('-'), _DIGITS), 14),
+    'Process ID': ((_DIGITS,), 5),
+    'Random alphanumeric string': ((_DIGITS,), 12),
+}
+
 
 class Sanitizer:
     """
@@ -59,7 +92,7 @@ class Sanitizer:
     SANITIZATION_RULES = [
         # IPv4 addresses
         (
-            r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b',
+            r'\b\d{1,3}+\.\d{1,3}+\.\d{1,3}+\.\d{1,3}+\b',
             '<IP>',
             'IPv4 Address'
         ),
@@ -94,21 +127,21 @@ class Sanitizer:
 
         # Hostnames in URLs (preserve protocol)
         (
-            r'(https?://)([a-zA-Z0-9][-a-zA-Z0-9]*\.)+[a-zA-Z]{2,}',
-            r'\1<HOST>',
+            r'(?P<URL_PROTO>https?://)(?:[a-zA-Z0-9][-a-zA-Z0-9]*\.)+[a-zA-Z]{2,}',
+            r'\g<URL_PROTO><HOST>',
             'URL hostname'
         ),
 
         # ISO timestamps
         (
-            r'\b\d{4}[-/]\d{2}[-/]\d{2}[T\s]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?\b',
+            r'\b\d{4}[-/]\d{2}[-/]\d{2}[T\s]\d{2}:\d{2}:\d{2}(?:\.\d++)?(?:Z|[+-]\d{2}:?\d{2})?\b',
             '<TIME>',
             'ISO timestamp'
         ),
 
         # Unix timestamps (10-13 digits starting with 1)
         (
-            r'\b1[0-9]{9,12}\b',
+            r'\b1[0-9]{9,12}+\b',
             '<TIME>',
             'Unix timestamp'
         ),
@@ -136,7 +169,7 @@ class Sanitizer:
 
         # Process IDs in common formats
         (
-            r'\bpid[:\s]+\d+\b',
+            r'\bpid[:\s]++\d++\b',
             '<PID>',
             'Process ID'
         ),
@@ -144,28 +177,64 @@ class Sanitizer:
         # Random alphanumeric strings (12+ chars, mixed letters and digits)
         # Run last to avoid over-matching
         (
-            r'\b(?=[A-Za-z]*\d)(?=\d*[A-Za-z])[A-Za-z0-9]{12,}\b',
+            r'\b(?=[A-Za-z]*+\d)(?=\d*+[A-Za-z])[A-Za-z0-9]{12,}+\b',
             '<RAND>',
             'Random alphanumeric string'
         ),
     ]
 
-    @classmethod
-    def sanitize(cls, text: str) -> str:
-        """Apply all sanitization rules to input text."""
+    # Compiled once at class load so sanitize() skips the re module's
+    # pattern cache lookup on every call
+    _COMPILED_RULES = [
+        (re.compile(pattern, re.IGNORECASE), replacement, description)
+        for pattern, replacement, description in SANITIZATION_RULES
+    ]
+
+    # (pattern, replacement, required character sets, minimum length) per
+    # rule, in rule order
+    _RULE_PLAN = [
+        (pattern, replacement, *_RULE_PREREQUISITES[description])
+        for pattern, replacement, description in _COMPILED_RULES
+    ]
+
+    # All well-known SIDs as one alternation (longest first, so a SID is
+    # never shadowed by a shorter SID that prefixes it)
+    _WELL_KNOWN_SID_PATTERN = re.compile(
+        r'\b(' + '|'.join(
+            re.escape(sid) for sid in sorted(WELL_KNOWN_SIDS, key=len, reverse=True)
+        ) + r')\b',
+        re.IGNORECASE
+    )
+
+    @staticmethod
+    @lru_cache(maxsize=_CACHE_SIZE)
+    def sanitize(text: str) -> str:
+        """
+        Apply all sanitization rules to input text.
+
+        Memoized because alert batches repeat the same command lines
+        (scheduled tasks, service restarts, WMI polling).
+        """
         if not text:
             return ""
 
+        # Rules run one after another, each over the previous rule's
+        # output. Replacement tokens only add letters and angle brackets,
+        # so a rule whose required characters are missing from the
+        # original text cannot match later either.
+        present = set(text)
+
         # First pass: replace well-known SIDs with readable names
-        result = cls._replace_well_known_sids(text)
+        result = Sanitizer._replace_well_known_sids(text) if '-' in present else text
 
         # Second pass: apply regex rules (including generic SID pattern)
-        for pattern, replacement, _ in cls.SANITIZATION_RULES:
-            result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
+        for pattern, replacement, required, min_length in Sanitizer._RULE_PLAN:
+            if len(result) >= min_length and all(not chars.isdisjoint(present) for chars in required):
+                result = pattern.sub(replacement, result)
 
         # Normalize whitespace
         return ' '.join(result.split())
-    
+
     @classmethod
     def generate_template(cls, alert: dict) -> str:
         """
@@ -181,7 +250,6 @@ class Sanitizer:
             Template string suitable for comparison or hashing
         """
         pattern_id = str(alert.get('pattern_id', 0))
-        cmdline = cls.sanitize(alert.get('cmdline', ''))
 
         # Get parent process for additional context
         parent_details = alert.get('parent_details', {})
@@ -190,6 +258,14 @@ class Sanitizer:
         # Get filename (the process that triggered detection)
         filename = alert.get('filename', '')
 
+        return cls._build_template(pattern_id, alert.get('cmdline', ''), filename, parent_filename)
+
+    @staticmethod
+    @lru_cache(maxsize=_CACHE_SIZE)
+    def _build_template(pattern_id: str, cmdline: str, filename: str, parent_filename: str) -> str:
+        """Build (and memoize) the template string from its extracted parts."""
+        cmdline = Sanitizer.sanitize(cmdline)
+
         template_parts = [
             f"pattern:{pattern_id}",
             f"cmd:{cmdline}" if cmdline else "cmd:",
@@ -200,26 +276,63 @@ class Sanitizer:
         return '|'.join(template_parts)
 
     @classmethod
-    def hash_template(cls, template: str) -> str:
+    def hash_template(cls, template: str | bytes) -> str:
+        """
+        Generate a BLAKE2b hash of a template.
+
+        The hash is only used as a per-run identifier for grouping, so a
+        16-byte BLAKE2b digest is used rather than SHA-256 for speed.
+        
+        Args:
+            template: Template string from generate_template(), or the
+                same template already encoded as UTF-8 bytes
+            
+        Returns:
+            32-character hex string (16-byte digest)
+        """
+        if isinstance(template, str):
+            template = template.encode('utf-8')
+        return hashlib.blake2b(template, digest_size=16).hexdigest()
+
+    @classmethod
+    def hash_templates(cls, templates: Iterable[str]) -> list[str]:
         """
-        Generate SHA-256 hash of a template.
+        Hash many templates, producing the same digests as hash_template().
+
+        Templates from alerts with the same pattern_id share their
+        "pattern:N|" prefix, so the hasher state after that prefix is
+        computed once and copied for each template.
         
         Args:
-            template: Template string from generate_template()
+            templates: Template strings from generate_template()
             
         Returns:
-            64-character hex string (SHA-256 hash)
+            List of 32-character hex strings, in input order
         """
-        return hashlib.sha256(template.encode('utf-8')).hexdigest()
+        prefix_states = {}
+        hashes = []
+
+        for template in templates:
+            prefix, separator, tail = template.partition('|')
+            prefix += separator
+            state = prefix_states.get(prefix)
+            if state is None:
+                state = hashlib.blake2b(prefix.encode('utf-8'), digest_size=16)
+                prefix_states[prefix] = state
+
+            hasher = state.copy()
+            hasher.update(tail.encode('utf-8'))
+            hashes.append(hasher.hexdigest())
+
+        return hashes
     
     @classmethod
     def _replace_well_known_sids(cls, text: str) -> str:
         """Replace well-known SIDs with human-readable tokens."""
-        result = text
-        for sid, token in cls.WELL_KNOWN_SIDS.items():
-            pattern = r'\b' + re.escape(sid) + r'\b'
-            result = re.sub(pattern, token, result, flags=re.IGNORECASE)
-        return result
+        return cls._WELL_KNOWN_SID_PATTERN.sub(
+            lambda match: cls.WELL_KNOWN_SIDS[match.group(1).upper()],
+            text
+        )
     
 
 def extract_qa_fields(alert: dict) -> dict:
@@ -237,17 +350,21 @@ def extract_qa_fields(alert: dict) -> dict:
     """
 
     # Handle nested device info
-    device = alert.get('device', {}) or {}
+    device = alert.get('device') or _EMPTY
     
     # Handle nested parent details
-    parent_details = alert.get('parent_details', {}) or {}
+    parent_details = alert.get('parent_details') or _EMPTY
     
     # Handle nested grandparent details
-    grandparent_details = alert.get('grandparent_details', {}) or {}
+    grandparent_details = alert.get('grandparent_details') or _EMPTY
 
     # Extract MITRE ATT&CK data from new array format
     mitre_attack = _extract_mitre_attack(alert)
 
+    # Primary entry backs the deprecated flat fields; normalized entries
+    # always carry every MITRE key
+    primary_mitre = mitre_attack[0] if mitre_attack else None
+
     return {
         # Core identifiers (kept for JSON, hidden in HTML)
         'alert_id': alert.get('id'),
@@ -270,10 +387,10 @@ def extract_qa_fields(alert: dict) -> dict:
         # These fields are deprecated by CrowdStrike in favor of the mitre_attack
         # array above. Remove this section once CrowdStrike fully deprecates them.
         # -------------------------------------------------------------------------
-        'tactic': _get_primary_mitre_field(mitre_attack, 'tactic', alert.get('tactic')),
-        'tactic_id': _get_primary_mitre_field(mitre_attack, 'tactic_id', alert.get('tactic_id')),
-        'technique': _get_primary_mitre_field(mitre_attack, 'technique', alert.get('technique')),
-        'technique_id': _get_primary_mitre_field(mitre_attack, 'technique_id', alert.get('technique_id')),
+        'tactic': primary_mitre['tactic'] if primary_mitre else alert.get('tactic'),
+        'tactic_id': primary_mitre['tactic_id'] if primary_mitre else alert.get('tactic_id'),
+        'technique': primary_mitre['technique'] if primary_mitre else alert.get('technique'),
+        'technique_id': primary_mitre['technique_id'] if primary_mitre else alert.get('technique_id'),
         # -------------------------------------------------------------------------
         # END DEPRECATED SECTION
         # -------------------------------------------------------------------------
@@ -380,35 +497,18 @@ def _extract_mitre_attack(alert: dict) -> list[dict]:
     return []
 
 
-def _get_primary_mitre_field(mitre_attack: list[dict], field: str, fallback: str | None) -> str | None:
-    """
-    Get the primary (first) value for a MITRE field from the array.
-    
-    Used for backward compatibility with code that expects flat fields.
-    
-    Args:
-        mitre_attack: List of MITRE ATT&CK entries
-        field: Field name to extract (tactic, tactic_id, technique, technique_id)
-        fallback: Value to use if mitre_attack is empty
-        
-    Returns:
-        Primary value for the field, or fallback if unavailable
-    """
-    if mitre_attack and len(mitre_attack) > 0:
-        return mitre_attack[0].get(field)
-    return fallback
-
-
 # For debugging: print what each rule would match
 def debug_sanitization(cmdline: str) -> None:
     """Show which sanitization rules match a given command line."""
-    print(f"Original: {cmdline}\n")
+    # Collected and printed at once so the report is a single write
+    lines = [f"Original: {cmdline}\n"]
     
-    for pattern, replacement, description in Sanitizer.SANITIZATION_RULES:
-        matches = re.findall(pattern, cmdline)
+    for pattern, replacement, description in Sanitizer._COMPILED_RULES:
+        matches = [match.group(0) for match in pattern.finditer(cmdline)]
         if matches:
-            print(f"  {description}:")
+            lines.append(f"  {description}:")
             for match in matches[:3]:  # Limit output
-                print(f"    '{match}' -> '{replacement}'")
+                lines.append(f"    '{match}' -> '{replacement}'")
     
-    print(f"\nSanitized: {Sanitizer.sanitize(cmdline)}")
\ No newline at end of file
+    lines.append(f"\nSanitized: {Sanitizer.sanitize(cmdline)}")
+    print('\n'.join(lines))
\ No newline at end of file
@@ -13,8 +13,17 @@ The similarity analysis respects the primary grouping constraint: templates
 are only compared within the same pattern_id.
 """
 
+import heapq
 import re
 from dataclasses import dataclass
+from functools import lru_cache
+
+
+# Whitespace and common delimiters that separate template tokens
+_TOKEN_RE = re.compile(r'[\s\\/\-\.\,\;\:\=]+')
+
+# Distinct templates kept by the tokenize() cache
+_TOKENIZE_CACHE_SIZE = 4096
 
 
 @dataclass
@@ -44,17 +53,18 @@ class SimilarityAnalyzer:
             raise ValueError("similarity_threshold must be between 0 and 1")
         
         self.threshold = similarity_threshold
-        self._template_tokens: dict[str, set[str]] = {}  # hash -> token set
+        self._template_rows: dict[str, tuple[frozenset[int], int, int]] = {}  # hash -> (token ids, bitmap, size)
         self._template_raw: dict[str, str] = {}  # hash -> original template
         self._hash_to_pattern: dict[str, int] = {}  # hash -> pattern_id
         self._pattern_to_hashes: dict[int, set[str]] = {}  # pattern_id -> set of hashes
+        self._token_to_hashes: dict[int, dict[int, set[str]]] = {}  # pattern_id -> token id -> hashes
+        self._pattern_vocab: dict[int, dict[str, int]] = {}  # pattern_id -> token -> token id
+        self._pattern_tokens: dict[int, list[str]] = {}  # pattern_id -> token id -> token
+        self._similar_cache: dict[tuple[str, str, int, int], list[SimilarMatch]] = {}  # query -> find_similar() result
     
-    def tokenize(self, template: str) -> set[str]:
+    def tokenize(self, template: str) -> frozenset[str]:
         """Convert sanitized template to token set."""
-        # Split on whitespace and common delimiters
-        tokens = re.split(r'[\s\\/\-\.\,\;\:\=]+', template.lower())
-        # Filter empty tokens and very short ones (noise)
-        return {t for t in tokens if len(t) > 1}
+        return _tokenize(template)
     
     def index_template(
         self, 
@@ -63,7 +73,34 @@ class SimilarityAnalyzer:
         pattern_id: int
     ) -> None:
         """Add a template to the similarity index."""
-        self._template_tokens[template_hash] = self.tokenize(template)
+        # Any cached find_similar() result may be stale now
+        self._similar_cache.clear()
+
+        # Re-indexing a hash must not leave stale postings behind
+        if template_hash in self._template_rows:
+            old_postings = self._token_to_hashes[self._hash_to_pattern[template_hash]]
+            for token_id in self._template_rows[template_hash][0]:
+                old_postings[token_id].discard(template_hash)
+
+        # Tokens are interned to small per-pattern ids, so each distinct
+        # token string is stored once per pattern_id
+        vocab = self._pattern_vocab.setdefault(pattern_id, {})
+        names = self._pattern_tokens.setdefault(pattern_id, [])
+        token_ids = set()
+        for token in self.tokenize(template):
+            token_id = vocab.get(token)
+            if token_id is None:
+                token_id = vocab[token] = len(names)
+                names.append(token)
+            token_ids.add(token_id)
+
+        # Token ids, bitmap (for popcount-based Jaccard) and size in one row,
+        # so scoring a candidate takes a single lookup
+        self._template_rows[template_hash] = (
+            frozenset(token_ids),
+            self._pack_bits(token_ids),
+            len(token_ids),
+        )
         self._template_raw[template_hash] = template
         self._hash_to_pattern[template_hash] = pattern_id
 
@@ -71,10 +108,23 @@ class SimilarityAnalyzer:
         if pattern_id not in self._pattern_to_hashes:
             self._pattern_to_hashes[pattern_id] = set()
         self._pattern_to_hashes[pattern_id].add(template_hash)
+
+        # Inverted index so queries only score templates sharing a token
+        postings = self._token_to_hashes.setdefault(pattern_id, {})
+        for token_id in token_ids:
+            postings.setdefault(token_id, set()).add(template_hash)
+
+    @staticmethod
+    def _pack_bits(token_ids) -> int:
+        """Pack token ids into an int bitmap."""
+        bits = 0
+        for token_id in token_ids:
+            bits |= 1 << token_id
+        return bits
     
     def index_count(self) -> int:
         """Return the number of templates in the index."""
-        return len(self._template_tokens)
+        return len(self._template_rows)
     
     def patterns_indexed(self) -> int:
         """Return the number of unique pattern_ids in the index."""
@@ -89,10 +139,42 @@ class SimilarityAnalyzer:
         """
         if not set_a or not set_b:
             return 0.0
-        intersection = len(set_a & set_b)
-        union = len(set_a | set_b)
-        return intersection / union if union > 0 else 0.0
+        # Count the intersection rather than building intersection/union sets;
+        # |A ∪ B| = |A| + |B| - |A ∩ B|
+        size_a = len(set_a)
+        size_b = len(set_b)
+        if size_a > size_b:
+            set_a, set_b = set_b, set_a
+        contains = set_b.__contains__
+        intersection = 0
+        for token in set_a:
+            if contains(token):
+                intersection += 1
+        return intersection / (size_a + size_b - intersection)
     
+    def _size_bounds(self, query_size: int) -> tuple[int, int]:
+        """
+        Return the template sizes that can reach the threshold against a query.
+
+        Jaccard can never exceed min(|A|,|B|) / max(|A|,|B|), so only sizes
+        n with n / |A| >= threshold (n <= |A|) or |A| / n >= threshold
+        (n > |A|) can match. The bounds are found with the same float
+        division used for scoring, so boundary sizes are never excluded.
+        """
+        threshold = self.threshold
+
+        min_size = max(int(threshold * query_size), 1)
+        while min_size / query_size < threshold:
+            min_size += 1
+        while min_size > 1 and (min_size - 1) / query_size >= threshold:
+            min_size -= 1
+
+        max_size = int(query_size / threshold) + 1
+        while query_size / max_size < threshold:
+            max_size -= 1
+
+        return min_size, max_size
+
     def find_similar(
         self, 
         template_hash: str, 
@@ -117,34 +199,88 @@ class SimilarityAnalyzer:
             List of SimilarMatch objects sorted by similarity (descending).
             Only includes matches above the similarity_threshold.
         """
-        query_tokens = self.tokenize(template)
+        # Alerts sharing a template repeat the same query; results are
+        # cached until the index changes
+        cache_key = (template_hash, template, pattern_id, max_results)
+        cached = self._similar_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
         candidates = []
-        
-        # Get candidate hashes from the same pattern_id only
-        candidate_hashes = self._pattern_to_hashes.get(pattern_id, set())
-        
+
+        # Postings for the same pattern_id only
+        postings = self._token_to_hashes.get(pattern_id)
+        if not postings:
+            return candidates
+        names = self._pattern_tokens[pattern_id]
+
+        if self._hash_to_pattern.get(template_hash) == pattern_id:
+            # Indexed templates were already tokenized by index_template()
+            query_ids = self._template_rows[template_hash][0]
+            unknown_tokens = set()
+        else:
+            # Tokens outside the pattern's vocabulary get no id but still
+            # count towards |A|
+            vocab = self._pattern_vocab[pattern_id]
+            query_ids = set()
+            unknown_tokens = set()
+            for token in self.tokenize(template):
+                token_id = vocab.get(token)
+                if token_id is None:
+                    unknown_tokens.add(token)
+                else:
+                    query_ids.add(token_id)
+
+        query_size = len(query_ids) + len(unknown_tokens)
+        if not query_size:
+            return candidates
+        query_bits = self._pack_bits(query_ids)
+
+        # Prefix filter: a template with Jaccard >= threshold shares at least
+        # threshold * |A| tokens with the query, so it must contain one of any
+        # |A| - int(threshold * |A|) + 1 query tokens. Unknown tokens are in
+        # no template, so they fill the front of that prefix; the rest is
+        # probed rarest first to keep the candidate set small while still
+        # finding every match.
+        prefix_size = query_size - int(self.threshold * query_size) + 1 - len(unknown_tokens)
+        probe_ids = sorted(query_ids, key=lambda token_id: len(postings[token_id]))
+        candidate_hashes = set().union(
+            *(postings[token_id] for token_id in probe_ids[:max(prefix_size, 0)])
+        )
+        # Skip self-comparison
+        candidate_hashes.discard(template_hash)
+
+        min_size, max_size = self._size_bounds(query_size)
+
+        scored = []
         for other_hash in candidate_hashes:
-            # Skip self-comparison
-            if other_hash == template_hash:
+            other_ids, other_bits, other_size = self._template_rows[other_hash]
+
+            if not min_size <= other_size <= max_size:
                 continue
-            
-            other_tokens = self._template_tokens[other_hash]
-            similarity = self.jaccard_similarity(query_tokens, other_tokens)
+
+            intersection = (query_bits & other_bits).bit_count()
+            similarity = intersection / (query_size + other_size - intersection)
             
             if similarity >= self.threshold:
-                candidates.append(SimilarMatch(
-                    template_hash=other_hash,
-                    template=self._template_raw[other_hash],
-                    similarity=round(similarity, 3),
-                    shared_tokens=query_tokens & other_tokens,
-                    unique_to_query=query_tokens - other_tokens,
-                    unique_to_match=other_tokens - query_tokens,
-                    pattern_id=pattern_id
-                ))
+                scored.append((similarity, other_hash, other_ids))
         
-        # Sort by similarity descending
-        candidates.sort(key=lambda x: x.similarity, reverse=True)
-        return candidates[:max_results]
+        # Keep the max_results most similar, then build token sets only for those
+        for similarity, other_hash, other_ids in heapq.nlargest(
+            max_results, scored, key=lambda x: x[0]
+        ):
+            candidates.append(SimilarMatch(
+                template_hash=other_hash,
+                template=self._template_raw[other_hash],
+                similarity=round(similarity, 3),
+                shared_tokens={names[i] for i in query_ids & other_ids},
+                unique_to_query={names[i] for i in query_ids - other_ids} | unknown_tokens,
+                unique_to_match={names[i] for i in other_ids - query_ids},
+                pattern_id=pattern_id
+            ))
+
+        self._similar_cache[cache_key] = candidates
+        return list(candidates)
     
     def find_similar_batch(
         self,
@@ -163,6 +299,9 @@ class SimilarityAnalyzer:
         """
         results = {}
         for template_hash, template, pattern_id in queries:
+            # Repeated queries for the same template share one result
+            if template_hash in results:
+                continue
             results[template_hash] = self.find_similar(
                 template_hash, 
                 template, 
@@ -170,7 +309,22 @@ class SimilarityAnalyzer:
                 max_results_per_query
             )
         return results
-    
+
+
+@lru_cache(maxsize=_TOKENIZE_CACHE_SIZE)
+def _tokenize(template: str) -> frozenset[str]:
+    """
+    Split a template into its token set.
+
+    Memoized because every historical alert is indexed, and alerts sharing
+    a template re-index the same string.
+    """
+    # Split on whitespace and common delimiters
+    tokens = _TOKEN_RE.split(template.lower())
+    # Filter empty tokens and very short ones (noise)
+    return frozenset(t for t in tokens if len(t) > 1)
+
+
 def enrich_qa_finding_with_similarity(
     finding: dict,
     similar_matches: list[SimilarMatch],
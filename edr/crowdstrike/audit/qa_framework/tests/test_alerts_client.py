@@ -16,14 +16,11 @@ The config module is mocked in conftest.py before this file is loaded.
 """
 
 import pytest
-from unittest.mock import MagicMock, patch
+from importlib.util import find_spec
+from unittest.mock import Mock, patch
 
-# Check if falconpy is available
-try:
-    import falconpy
-    FALCONPY_AVAILABLE = True
-except ImportError:
-    FALCONPY_AVAILABLE = False
+# Check if falconpy is available without executing the package
+FALCONPY_AVAILABLE = find_spec("falconpy") is not None
 
 # Skip all tests in this module if falconpy is not installed
 pytestmark = pytest.mark.skipif(
@@ -32,20 +29,68 @@ pytestmark = pytest.mark.skipif(
 )
 
 
+if FALCONPY_AVAILABLE:
+    from alerts_client import AlertsClient, validate_api_response
+
+# One full page of query results (the client requests 500 per page)
+_PAGE_IDS = tuple(f'id_{i}' for i in range(500))
+_PAGE_RESOURCES = tuple({'id': i} for i in _PAGE_IDS)
+
+# FQL fragments the last-day and historical filters must contain
+_CLOSED_FILTER_TOKENS = ("status:'closed'",)
+_HISTORICAL_FILTER_TOKENS = _CLOSED_FILTER_TOKENS + (
+    "pattern_id:", "'50007'", "'50102'", "now-90d",
+)
+
+
+def _call_kwarg(mock_method, name):
+    """Return a keyword argument from the most recent call to mock_method.
+
+    AlertsClient passes every API parameter by keyword, so a missing key is
+    a real failure rather than something to fall back from.
+    """
+    return mock_method.call_args.kwargs[name]
+
+
+@pytest.fixture(scope="class")
+def mock_alerts_class():
+    """Patch alerts_client.Alerts once for every test in a class.
+
+    A plain Mock is enough here: the client never uses magic methods, and
+    Mock children are much cheaper to build than MagicMock ones.
+    """
+    with patch('alerts_client.Alerts', new_callable=Mock) as mock_class:
+        yield mock_class
+
+
+@pytest.fixture(scope="class")
+def shared_client(mock_alerts_class):
+    """One AlertsClient per class, built against the patched Alerts."""
+    return AlertsClient()
+
+
+@pytest.fixture
+def patched_client(shared_client, mock_alerts_class):
+    """AlertsClient wired to a mocked falconpy Alerts instance.
+
+    Yields (client, mock_client) where mock_client is the object the
+    AlertsClient delegates its API calls to. The client and patch are shared
+    across the class, so mock state is reset after each test.
+    """
+    yield shared_client, mock_alerts_class.return_value
+    mock_alerts_class.return_value.reset_mock(return_value=True, side_effect=True)
+
+
 class TestValidateApiResponse:
     """Tests for the validate_api_response helper function."""
 
     def test_valid_response(self, mock_api_response_query):
         """Valid 200 response should not raise."""
-        from alerts_client import validate_api_response
-        
         # Should not raise
         validate_api_response(mock_api_response_query)
 
     def test_error_response(self, mock_api_error_response):
         """Non-200 response should raise Exception."""
-        from alerts_client import validate_api_response
-        
         with pytest.raises(Exception) as excinfo:
             validate_api_response(mock_api_error_response)
         
@@ -53,8 +98,6 @@ class TestValidateApiResponse:
 
     def test_missing_status_code(self):
         """Missing status_code should raise."""
-        from alerts_client import validate_api_response
-        
         with pytest.raises(Exception):
             validate_api_response({'body': {}})
 
@@ -62,12 +105,9 @@ class TestValidateApiResponse:
 class TestAlertsClientInit:
     """Tests for AlertsClient initialization."""
 
-    @patch('alerts_client.Alerts')
     def test_init_creates_client(self, mock_alerts_class):
         """Should create Alerts client with config credentials."""
-        from alerts_client import AlertsClient
-        
-        client = AlertsClient()
+        AlertsClient()
         
         mock_alerts_class.assert_called_once_with(
             client_id='test_client_id',
@@ -79,153 +119,95 @@ class TestAlertsClientInit:
 class TestFetchAlertsFromLastDay:
     """Tests for fetch_alerts_from_last_day method."""
 
-    @patch('alerts_client.Alerts')
-    def test_default_hours(self, mock_alerts_class):
-        """Default should query last 24 hours."""
-        mock_client = MagicMock()
-        mock_alerts_class.return_value = mock_client
+    @pytest.mark.parametrize("kwargs,expected_token", [
+        pytest.param({}, 'now-24h', id="default"),
+        pytest.param({'hours': 48}, 'now-48h', id="custom"),
+    ])
+    def test_hours_filter(self, patched_client, empty_query_response, kwargs, expected_token):
+        """Should query the last N hours of closed alerts (24 by default)."""
+        client, mock_client = patched_client
         
-        # Setup mock responses
-        mock_client.query_alerts_v2.return_value = {
-            'status_code': 200,
-            'body': {
-                'resources': [],
-                'meta': {'pagination': {'total': 0}}
-            }
-        }
+        mock_client.query_alerts_v2.return_value = empty_query_response
         
-        from alerts_client import AlertsClient
-        client = AlertsClient()
-        client.fetch_alerts_from_last_day()
+        client.fetch_alerts_from_last_day(**kwargs)
         
         # Check that query was called with correct filter
-        call_args = mock_client.query_alerts_v2.call_args
-        filter_arg = call_args.kwargs.get('filter') or call_args[1].get('filter')
-        assert 'now-24h' in filter_arg
-        assert "status:'closed'" in filter_arg
-
-    @patch('alerts_client.Alerts')
-    def test_custom_hours(self, mock_alerts_class):
-        """Should respect custom hours parameter."""
-        mock_client = MagicMock()
-        mock_alerts_class.return_value = mock_client
-        
-        mock_client.query_alerts_v2.return_value = {
-            'status_code': 200,
-            'body': {
-                'resources': [],
-                'meta': {'pagination': {'total': 0}}
-            }
-        }
-        
-        from alerts_client import AlertsClient
-        client = AlertsClient()
-        client.fetch_alerts_from_last_day(hours=48)
-        
-        call_args = mock_client.query_alerts_v2.call_args
-        filter_arg = call_args.kwargs.get('filter') or call_args[1].get('filter')
-        assert 'now-48h' in filter_arg
+        filter_arg = _call_kwarg(mock_client.query_alerts_v2, 'filter')
+        for token in (expected_token,) + _CLOSED_FILTER_TOKENS:
+            assert token in filter_arg
 
 
 class TestFetchHistoricalAlertsByPatternId:
     """Tests for fetch_historical_alerts_by_pattern_id method."""
 
-    @patch('alerts_client.Alerts')
-    def test_empty_pattern_ids(self, mock_alerts_class):
-        """Empty pattern_ids list should return None."""
-        from alerts_client import AlertsClient
-        client = AlertsClient()
-        
-        result = client.fetch_historical_alerts_by_pattern_id([])
-        
-        assert result is None
-
-    @patch('alerts_client.Alerts')
-    def test_none_pattern_ids(self, mock_alerts_class):
-        """None pattern_ids should return None."""
-        from alerts_client import AlertsClient
-        client = AlertsClient()
+    @pytest.mark.parametrize("pattern_ids", [
+        pytest.param([], id="empty"),
+        pytest.param(None, id="none"),
+    ])
+    def test_missing_pattern_ids(self, patched_client, pattern_ids):
+        """Empty or None pattern_ids should return None."""
+        client, _ = patched_client
         
-        result = client.fetch_historical_alerts_by_pattern_id(None) # type: ignore
+        result = client.fetch_historical_alerts_by_pattern_id(pattern_ids) # type: ignore
         
         assert result is None
 
-    @patch('alerts_client.Alerts')
-    def test_builds_correct_fql_filter(self, mock_alerts_class):
+    def test_builds_correct_fql_filter(self, patched_client, empty_query_response):
         """Should build FQL filter with pattern_id list."""
-        mock_client = MagicMock()
-        mock_alerts_class.return_value = mock_client
+        client, mock_client = patched_client
         
-        mock_client.get_alerts_combined.return_value = {  # Changed from query_alerts_v2
-            'status_code': 200,
-            'body': {
-                'resources': [],
-                'meta': {'pagination': {'total': 0}}
-            }
-        }
+        mock_client.get_alerts_combined.return_value = empty_query_response
         
-        from alerts_client import AlertsClient
-        client = AlertsClient()
         client.fetch_historical_alerts_by_pattern_id([50007, 50102], days=90)
         
-        call_args = mock_client.get_alerts_combined.call_args  # Changed from query_alerts_v2
-        filter_arg = call_args.kwargs.get('filter') or call_args[1].get('filter')
+        filter_arg = _call_kwarg(mock_client.get_alerts_combined, 'filter')
         
-        assert "pattern_id:" in filter_arg
-        assert "'50007'" in filter_arg
-        assert "'50102'" in filter_arg
-        assert "now-90d" in filter_arg
+        for token in _HISTORICAL_FILTER_TOKENS:
+            assert token in filter_arg
 
 
 class TestFetchAlertsHelper:
     """Tests for the fetch_alerts_helper pagination logic."""
 
-    @patch('alerts_client.Alerts')
-    def test_single_page_results(self, mock_alerts_class):
-        """Single page of results should be returned correctly."""
-        mock_client = MagicMock()
-        mock_alerts_class.return_value = mock_client
+    @pytest.mark.parametrize("ids", [
+        pytest.param((), id="empty"),
+        pytest.param(('id1', 'id2', 'id3'), id="single_page"),
+    ])
+    def test_single_page_results(self, patched_client, ids):
+        """A single page of IDs should be fetched and returned in order.
+
+        When the query returns no IDs, get_alerts_v2 should not be called.
+        """
+        client, mock_client = patched_client
         
-        # Query returns 3 IDs
         mock_client.query_alerts_v2.return_value = {
             'status_code': 200,
             'body': {
-                'resources': ['id1', 'id2', 'id3'],
-                'meta': {'pagination': {'total': 3}}
+                'resources': list(ids),
+                'meta': {'pagination': {'total': len(ids)}}
             }
         }
         
-        # Get details returns 3 alerts
         mock_client.get_alerts_v2.return_value = {
             'status_code': 200,
-            'body': {
-                'resources': [
-                    {'id': 'id1', 'pattern_id': 50007},
-                    {'id': 'id2', 'pattern_id': 50007},
-                    {'id': 'id3', 'pattern_id': 50102},
-                ]
-            }
+            'body': {'resources': [{'id': i} for i in ids]}
         }
         
-        from alerts_client import AlertsClient
-        client = AlertsClient()
         alerts = client.fetch_alerts_from_last_day()
         
-        assert len(alerts) == 3
-        assert alerts[0]['id'] == 'id1'
+        assert [a['id'] for a in alerts] == list(ids)
+        assert mock_client.get_alerts_v2.called is bool(ids)
 
-    @patch('alerts_client.Alerts')
-    def test_pagination_multiple_pages(self, mock_alerts_class):
+    def test_pagination_multiple_pages(self, patched_client):
         """Should paginate through multiple pages of results."""
-        mock_client = MagicMock()
-        mock_alerts_class.return_value = mock_client
+        client, mock_client = patched_client
         
         # First query returns 500 IDs, second returns empty (end of results)
         mock_client.query_alerts_v2.side_effect = [
             {
                 'status_code': 200,
                 'body': {
-                    'resources': [f'id_{i}' for i in range(500)],
+                    'resources': list(_PAGE_IDS),
                     'meta': {'pagination': {'total': 500}}
                 }
             },
@@ -241,22 +223,18 @@ class TestFetchAlertsHelper:
         mock_client.get_alerts_v2.return_value = {
             'status_code': 200,
             'body': {
-                'resources': [{'id': f'id_{i}'} for i in range(500)]
+                'resources': [dict(r) for r in _PAGE_RESOURCES]
             }
         }
         
-        from alerts_client import AlertsClient
-        client = AlertsClient()
-        alerts = client.fetch_alerts_from_last_day()
+        client.fetch_alerts_from_last_day()
         
         # Should have called query twice (pagination)
         assert mock_client.query_alerts_v2.call_count == 2
 
-    @patch('alerts_client.Alerts')
-    def test_uses_composite_ids(self, mock_alerts_class):
+    def test_uses_composite_ids(self, patched_client):
         """Should use composite_ids parameter for get_alerts_v2."""
-        mock_client = MagicMock()
-        mock_alerts_class.return_value = mock_client
+        client, mock_client = patched_client
         
         mock_client.query_alerts_v2.return_value = {
             'status_code': 200,
@@ -271,8 +249,6 @@ class TestFetchAlertsHelper:
             'body': {'resources': [{'id': '1'}, {'id': '2'}]}
         }
         
-        from alerts_client import AlertsClient
-        client = AlertsClient()
         client.fetch_alerts_from_last_day()
         
         # Should use composite_ids, not ids
@@ -280,56 +256,17 @@ class TestFetchAlertsHelper:
             composite_ids=['comp:id:1', 'comp:id:2']
         )
 
-    @patch('alerts_client.Alerts')
-    def test_empty_results(self, mock_alerts_class):
-        """Empty results should return empty list."""
-        mock_client = MagicMock()
-        mock_alerts_class.return_value = mock_client
-        
-        mock_client.query_alerts_v2.return_value = {
-            'status_code': 200,
-            'body': {
-                'resources': [],
-                'meta': {'pagination': {'total': 0}}
-            }
-        }
-        
-        from alerts_client import AlertsClient
-        client = AlertsClient()
-        alerts = client.fetch_alerts_from_last_day()
-        
-        assert alerts == []
-        # get_alerts_v2 should not be called if no IDs returned
-        mock_client.get_alerts_v2.assert_not_called()
-
 
 class TestErrorHandling:
     """Tests for error handling in API calls."""
 
-    @patch('alerts_client.Alerts')
-    def test_query_error_raises(self, mock_alerts_class):
-        """API error during query should raise exception."""
-        mock_client = MagicMock()
-        mock_alerts_class.return_value = mock_client
-        
-        mock_client.query_alerts_v2.return_value = {
-            'status_code': 401,
-            'body': {'errors': [{'message': 'Unauthorized'}]}
-        }
-        
-        from alerts_client import AlertsClient
-        client = AlertsClient()
-        
-        with pytest.raises(Exception) as excinfo:
-            client.fetch_alerts_from_last_day()
-        
-        assert "API error" in str(excinfo.value)
-
-    @patch('alerts_client.Alerts')
-    def test_details_error_raises(self, mock_alerts_class):
-        """API error during get_alerts_v2 should raise exception."""
-        mock_client = MagicMock()
-        mock_alerts_class.return_value = mock_client
+    @pytest.mark.parametrize("failing_call,status_code", [
+        pytest.param('query_alerts_v2', 401, id="query"),
+        pytest.param('get_alerts_v2', 500, id="details"),
+    ])
+    def test_api_error_raises(self, patched_client, failing_call, status_code):
+        """API error from either the query or the details call should raise."""
+        client, mock_client = patched_client
         
         mock_client.query_alerts_v2.return_value = {
             'status_code': 200,
@@ -340,14 +277,16 @@ class TestErrorHandling:
         }
         
         mock_client.get_alerts_v2.return_value = {
-            'status_code': 500,
-            'body': {'errors': [{'message': 'Internal Server Error'}]}
+            'status_code': 200,
+            'body': {'resources': [{'id': 'id1'}]}
         }
         
-        from alerts_client import AlertsClient
-        client = AlertsClient()
+        getattr(mock_client, failing_call).return_value = {
+            'status_code': status_code,
+            'body': {'errors': [{'message': 'Request failed'}]}
+        }
         
         with pytest.raises(Exception) as excinfo:
             client.fetch_alerts_from_last_day()
         
-        assert "API error" in str(excinfo.value)
\ No newline at end of file
+        assert "API error" in str(excinfo.value)
@@ -11,7 +11,8 @@ These tests verify that:
 """
 
 import pytest
-from consensus import ConsensusCalculator
+import consensus
+from consensus import ConsensusCalculator, IncrementalConsensus, encode_resolutions
 
 
 class TestConsensusCalculatorInit:
@@ -159,6 +160,115 @@ class TestCalculateConsensus:
         # Strength depends on CI lower bound
 
 
+class TestCalculateConsensusBatch:
+    """Tests for batched consensus calculation."""
+
+    def test_matches_per_group_calculation(self):
+        """Each batched result should equal calculate_consensus on its group."""
+        calc = ConsensusCalculator(min_samples=20)
+        groups = [
+            [],
+            ['true_positive'] * 5,
+            ['true_positive'] * 95 + ['false_positive'] * 5,
+            ['false_positive'] * 30,
+            ['true_positive'] * 17 + ['false_positive'] * 13 + [None, ''],
+        ]
+        
+        results = calc.calculate_consensus_batch(groups)
+        
+        assert results == [calc.calculate_consensus(g) for g in groups]
+
+    def test_empty_batch(self):
+        """An empty batch should return an empty list."""
+        calc = ConsensusCalculator()
+        
+        assert calc.calculate_consensus_batch([]) == []
+
+
+class TestCalculateConsensusFromCodes:
+    """Tests for consensus calculation over encoded resolutions."""
+
+    @pytest.mark.parametrize("resolutions", [
+        pytest.param([], id="empty"),
+        pytest.param(['true_positive'] * 5 + ['false_positive'], id="insufficient"),
+        pytest.param(['true_positive'] * 95 + ['false_positive'] * 5, id="strong"),
+        pytest.param(
+            ['false_positive'] * 20 + ['ignored'] * 15 + ['true_positive'] * 10,
+            id="three_way",
+        ),
+        pytest.param(['false_positive', 'true_positive'] * 15, id="tie_first_seen"),
+        pytest.param(['ignored'] + ['true_positive', 'ignored'] * 10, id="tie_later_code_first"),
+    ])
+    def test_matches_string_api(self, resolutions):
+        """Encoded input should produce the same result as strings."""
+        calc = ConsensusCalculator(min_samples=20)
+        
+        codes = encode_resolutions(resolutions)
+        
+        assert calc.calculate_consensus_from_codes(codes) == calc.calculate_consensus(resolutions)
+
+    def test_tie_goes_to_first_seen(self):
+        """Equally common resolutions should tie-break by first occurrence."""
+        calc = ConsensusCalculator(min_samples=20)
+        resolutions = ['false_positive', 'true_positive'] * 15
+        
+        result = calc.calculate_consensus_from_codes(encode_resolutions(resolutions))
+        
+        assert result['majority_resolution'] == 'false_positive'
+        assert list(result['distribution']) == ['false_positive', 'true_positive']
+
+    def test_bytes_fallback_matches_string_api(self, monkeypatch):
+        """Without NumPy, codes are bytes and tally the same way."""
+        monkeypatch.setattr(consensus, '_np', None)
+        calc = ConsensusCalculator(min_samples=20)
+        resolutions = ['ignored'] * 5 + ['false_positive', 'true_positive'] * 12
+        
+        codes = encode_resolutions(resolutions)
+        
+        assert isinstance(codes, bytes)
+        assert calc.calculate_consensus_from_codes(codes) == calc.calculate_consensus(resolutions)
+
+    def test_numpy_bincount_matches_string_api(self):
+        """With NumPy, codes are an int8 array tallied by np.bincount."""
+        np = pytest.importorskip('numpy')
+        calc = ConsensusCalculator(min_samples=20)
+        resolutions = ['ignored'] * 5 + ['false_positive', 'true_positive'] * 12
+        
+        codes = encode_resolutions(resolutions)
+        
+        assert isinstance(codes, np.ndarray)
+        assert codes.dtype == np.int8
+        assert calc.calculate_consensus_from_codes(codes) == calc.calculate_consensus(resolutions)
+
+    def test_encode_drops_empty_resolutions(self):
+        """None and empty resolutions should not be encoded."""
+        codes = encode_resolutions(['true_positive', None, '', 'ignored'])
+        
+        assert len(codes) == 2
+
+    def test_encode_unknown_resolution_raises(self):
+        """Unknown resolutions should raise rather than be miscounted."""
+        with pytest.raises(KeyError):
+            encode_resolutions(['true_positive', 'duplicate'])
+
+
+class TestIncrementalConsensus:
+    """Tests for incrementally updated consensus."""
+
+    def test_snapshot_matches_full_calculation(self):
+        """Each snapshot should equal calculate_consensus on the history so far."""
+        baseline = IncrementalConsensus(min_samples=10)
+        history = ['true_positive'] * 12 + [None, ''] + ['false_positive'] * 3
+        
+        for i, resolution in enumerate(history, 1):
+            baseline.update(resolution)
+            assert baseline.snapshot() == baseline.calculate_consensus(history[:i])
+
+    def test_empty_baseline(self):
+        """No updates should report no data."""
+        assert IncrementalConsensus().snapshot()['status'] == 'no_data'
+
+
 class TestWilsonInterval:
     """Tests for Wilson confidence interval calculation."""
 
@@ -181,6 +291,14 @@ class TestWilsonInterval:
         assert ci_low < 0.001  # Essentially zero
         assert ci_high < 0.05
 
+    def test_wilson_interval_unanimous_closed_form(self):
+        """0/n and n/n should use the simplified boundary formulas."""
+        calc = ConsensusCalculator()
+        z2 = 1.959963984540054 ** 2
+        
+        assert calc._wilson_interval(10, 10) == (pytest.approx(10 / (10 + z2)), 1.0)
+        assert calc._wilson_interval(0, 10) == (0.0, pytest.approx(z2 / (10 + z2)))
+
     def test_wilson_interval_small_sample(self):
         """Small samples should have wider intervals."""
         calc = ConsensusCalculator()
@@ -211,6 +329,20 @@ class TestWilsonInterval:
             ci_low, ci_high = calc._wilson_interval(successes, 100)
             assert 0 <= ci_low <= ci_high <= 1
 
+    def test_wilson_interval_batch_matches_scalar(self):
+        """Batched intervals should match the scalar calculation."""
+        calc = ConsensusCalculator()
+        pairs = [(0, 0), (0, 100), (9, 10), (90, 100), (100, 100), (1, 3)]
+        
+        lows, highs = calc._wilson_interval_batch(
+            [x for x, _ in pairs], [n for _, n in pairs]
+        )
+        
+        for (x, n), lo, hi in zip(pairs, lows, highs):
+            expected_lo, expected_hi = calc._wilson_interval(x, n)
+            assert lo == pytest.approx(expected_lo)
+            assert hi == pytest.approx(expected_hi)
+
 
 class TestDetectContradiction:
     """Tests for contradiction detection."""
@@ -5,186 +5,96 @@ Tests for the report generator module.
 """
 
 import json
-import pathlib
-import tempfile
 
 import pytest
 
+import report_generator
 from report_generator import (
     generate_reports,
     _format_duration,
     _format_resolution,
+    _escape,
+    _build_mitre_section,
     _build_process_chain,
     _build_severity_bars,
     _build_analyst_summary,
 )
 
 
-class TestGenerateReports:
-    """Tests for the main report generation function."""
+@pytest.fixture(scope="module")
+def generated(tmp_path_factory, sample_findings, sample_stats):
+    """Reports generated once from the sample data, shared read-only."""
+    return generate_reports(
+        findings=[dict(f) for f in sample_findings],
+        stats=sample_stats,
+        output_dir=tmp_path_factory.mktemp("reports"),
+        timestamp='2025-01-08',
+    )
 
-    @pytest.fixture
-    def sample_findings(self):
-        """Sample findings for testing."""
-        return [
-            {
-                'alert_id': 'ldt:abc123:456',
-                'composite_id': 'abc123:ind:456',
-                'template_hash': 'hash123',
-                'display_name': 'Suspicious PowerShell Execution',
-                'description': 'PowerShell executed with encoded command',
-                'hostname': 'WORKSTATION-001',
-                'pattern_id': 50007,
-                'tactic': 'Execution',
-                'tactic_id': 'TA0002',
-                'technique': 'PowerShell',
-                'technique_id': 'T1059.001',
-                'severity_name': 'High',
-                'confidence': 85,
-                'severity': 'CRITICAL',
-                'reason': 'contradicts_consensus',
-                'new_resolution': 'false_positive',
-                'historical_resolution': 'true_positive',
-                'consensus_strength': 'strong',
-                'historical_ratio': 0.95,
-                'sample_size': 150,
-                'analyst': 'analyst@example.com',
-                'seconds_to_resolved': 3600,
-                'cmdline': 'powershell.exe -enc SGVsbG8=',
-                'filename': 'powershell.exe',
-                'filepath': 'C:\\Windows\\System32\\powershell.exe',
-                'parent_filename': 'cmd.exe',
-                'grandparent_filename': 'explorer.exe',
-                'user_name': 'jsmith',
-                'falcon_link': 'https://falcon.crowdstrike.com/activity/detections/detail/abc123',
-                'related_patterns': [
-                    {
-                        'template_hash': 'hash456',
-                        'similarity': 0.85,
-                        'historical_consensus': 'true_positive',
-                        'sample_size': 50,
-                        'strength': 'strong',
-                        'differentiating_tokens': ['bypass', 'hidden'],
-                        'shared_tokens': ['powershell', 'enc'],
-                    }
-                ],
-            },
-            {
-                'alert_id': 'ldt:def456:789',
-                'composite_id': 'def456:ind:789',
-                'template_hash': 'hash789',
-                'display_name': 'Suspicious Network Connection',
-                'hostname': 'SERVER-002',
-                'pattern_id': 50102,
-                'severity': 'INFO',
-                'reason': 'novel_pattern',
-                'new_resolution': 'true_positive',
-                'historical_resolution': None,
-                'sample_size': 0,
-                'analyst': 'analyst2@example.com',
-                'cmdline': 'curl http://example.com',
-                'filename': 'curl.exe',
-                'falcon_link': 'https://falcon.crowdstrike.com/activity/detections/detail/def456',
-                'related_patterns': [],
-            },
-        ]
 
-    @pytest.fixture
-    def sample_stats(self):
-        """Sample statistics for testing."""
-        return {
-            'total_processed': 100,
-            'matches_consensus': 85,
-            'contradictions': 10,
-            'novel_patterns': 5,
-            'insufficient_data': 0,
-            'by_severity': {
-                'CRITICAL': 2,
-                'HIGH': 3,
-                'MEDIUM': 3,
-                'LOW': 2,
-                'INFO': 5,
-            },
-        }
+@pytest.fixture(scope="module")
+def generated_json(generated):
+    """Parsed contents of the shared JSON report."""
+    with open(generated['json']) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def generated_html(generated):
+    """Contents of the shared HTML report."""
+    return generated['html'].read_text()
+
+
+class TestGenerateReports:
+    """Tests for the main report generation function."""
 
-    def test_generate_reports_creates_both_files(self, sample_findings, sample_stats):
+    def test_generate_reports_creates_both_files(self, generated):
         """Should create both HTML and JSON report files."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = pathlib.Path(tmpdir)
-            
-            result = generate_reports(
-                findings=sample_findings,
-                stats=sample_stats,
-                output_dir=output_dir,
-                timestamp='2025-01-08',
-            )
-            
-            assert 'html' in result
-            assert 'json' in result
-            assert result['html'].exists()
-            assert result['json'].exists()
-
-    def test_generate_reports_json_structure(self, sample_findings, sample_stats):
+        assert 'html' in generated
+        assert 'json' in generated
+        assert generated['html'].exists()
+        assert generated['json'].exists()
+
+    def test_generate_reports_json_structure(self, generated_json, sample_stats):
         """JSON report should have correct structure."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = pathlib.Path(tmpdir)
-            
-            result = generate_reports(
-                findings=sample_findings,
-                stats=sample_stats,
-                output_dir=output_dir,
-            )
-            
-            with open(result['json']) as f:
-                data = json.load(f)
-            
-            assert 'generated_at' in data
-            assert 'summary' in data
-            assert 'findings' in data
-            assert data['summary'] == sample_stats
-            assert len(data['findings']) == 2
-
-    def test_generate_reports_json_preserves_all_fields(self, sample_findings, sample_stats):
+        assert 'generated_at' in generated_json
+        assert 'summary' in generated_json
+        assert 'findings' in generated_json
+        assert generated_json['summary'] == sample_stats
+        assert len(generated_json['findings']) == 2
+
+    def test_generate_reports_json_empty_findings(self, tmp_path, sample_stats):
+        """JSON report should stay valid when there are no findings."""
+        result = generate_reports(
+            findings=[],
+            stats=sample_stats,
+            output_dir=tmp_path,
+        )
+        
+        with open(result['json']) as f:
+            data = json.load(f)
+        
+        assert data['findings'] == []
+        assert data['summary'] == sample_stats
+
+    def test_generate_reports_json_preserves_all_fields(self, generated_json):
         """JSON report should preserve all finding fields."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = pathlib.Path(tmpdir)
-            
-            result = generate_reports(
-                findings=sample_findings,
-                stats=sample_stats,
-                output_dir=output_dir,
-            )
-            
-            with open(result['json']) as f:
-                data = json.load(f)
-            
-            # Check first finding has all expected fields
-            finding = data['findings'][0]
-            assert finding['alert_id'] == 'ldt:abc123:456'
-            assert finding['template_hash'] == 'hash123'
-            assert finding['related_patterns'] is not None
-            assert len(finding['related_patterns']) == 1
-
-    def test_generate_reports_html_contains_findings(self, sample_findings, sample_stats):
+        # Check first finding has all expected fields
+        finding = generated_json['findings'][0]
+        assert finding['alert_id'] == 'ldt:abc123:456'
+        assert finding['template_hash'] == 'hash123'
+        assert finding['related_patterns'] is not None
+        assert len(finding['related_patterns']) == 1
+
+    def test_generate_reports_html_contains_findings(self, generated_html):
         """HTML report should contain finding information."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = pathlib.Path(tmpdir)
-            
-            result = generate_reports(
-                findings=sample_findings,
-                stats=sample_stats,
-                output_dir=output_dir,
-            )
-            
-            html_content = result['html'].read_text()
-            
-            # Check for key content
-            assert 'WORKSTATION-001' in html_content
-            assert 'Suspicious PowerShell Execution' in html_content
-            assert 'analyst@example.com' in html_content
-            assert 'CRITICAL' in html_content
-
-    def test_generate_reports_html_escapes_content(self, sample_stats):
+        # Check for key content
+        assert 'WORKSTATION-001' in generated_html
+        assert 'Suspicious PowerShell Execution' in generated_html
+        assert 'analyst@example.com' in generated_html
+        assert 'CRITICAL' in generated_html
+
+    def test_generate_reports_html_escapes_content(self, tmp_path, sample_stats):
         """HTML report should escape potentially dangerous content."""
         malicious_findings = [
             {
@@ -201,39 +111,33 @@ class TestGenerateReports:
             }
         ]
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = pathlib.Path(tmpdir)
-            
-            result = generate_reports(
-                findings=malicious_findings,
-                stats=sample_stats,
-                output_dir=output_dir,
-            )
-            
-            html_content = result['html'].read_text()
-            
-            # User-provided content should be escaped
-            # The hostname should be escaped (not raw script tag)
-            assert '&lt;script&gt;alert' in html_content
-            # The cmdline should be escaped
-            assert '&lt;img src=x onerror=alert(1)&gt;' in html_content
-
-    def test_generate_reports_empty_findings(self, sample_stats):
+        result = generate_reports(
+            findings=malicious_findings,
+            stats=sample_stats,
+            output_dir=tmp_path,
+        )
+        
+        html_content = result['html'].read_text()
+        
+        # User-provided content should be escaped
+        # The hostname should be escaped (not raw script tag)
+        assert '&lt;script&gt;alert' in html_content
+        # The cmdline should be escaped
+        assert '&lt;img src=x onerror=alert(1)&gt;' in html_content
+
+    def test_generate_reports_empty_findings(self, tmp_path, sample_stats):
         """Should handle empty findings list."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = pathlib.Path(tmpdir)
-            
-            result = generate_reports(
-                findings=[],
-                stats=sample_stats,
-                output_dir=output_dir,
-            )
-            
-            assert result['html'].exists()
-            html_content = result['html'].read_text()
-            assert 'No findings to report' in html_content
-
-    def test_generate_reports_sorts_by_severity(self, sample_stats):
+        result = generate_reports(
+            findings=[],
+            stats=sample_stats,
+            output_dir=tmp_path,
+        )
+        
+        assert result['html'].exists()
+        html_content = result['html'].read_text()
+        assert 'No findings to report' in html_content
+
+    def test_generate_reports_sorts_by_severity(self, tmp_path, sample_stats):
         """Findings should be sorted by severity (CRITICAL first)."""
         findings = [
             {'severity': 'INFO', 'alert_id': '1', 'hostname': 'h1', 'new_resolution': 'tp', 
@@ -247,78 +151,82 @@ class TestGenerateReports:
              'cmdline': 'c', 'filename': 'f', 'related_patterns': []},
         ]
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = pathlib.Path(tmpdir)
-            
-            result = generate_reports(
-                findings=findings,
-                stats=sample_stats,
-                output_dir=output_dir,
-            )
-            
-            with open(result['json']) as f:
-                data = json.load(f)
-            
-            severities = [f['severity'] for f in data['findings']]
-            assert severities == ['CRITICAL', 'HIGH', 'INFO']
-
+        result = generate_reports(
+            findings=findings,
+            stats=sample_stats,
+            output_dir=tmp_path,
+        )
+        
+        with open(result['json']) as f:
+            data = json.load(f)
+        
+        severities = [f['severity'] for f in data['findings']]
+        assert severities == ['CRITICAL', 'HIGH', 'INFO']
 
-class TestFormatDuration:
-    """Tests for duration formatting."""
 
-    def test_format_seconds(self):
-        """Durations under a minute should show seconds."""
-        assert _format_duration(30) == '30s'
-        assert _format_duration(59) == '59s'
+class TestSortBySeverity:
+    """Tests for severity ordering of findings."""
 
-    def test_format_minutes(self):
-        """Durations under an hour should show minutes."""
-        assert _format_duration(60) == '1m'
-        assert _format_duration(120) == '2m'
-        assert _format_duration(3599) == '59m'
+    def test_stable_with_unknown_last(self):
+        """Ties keep input order; missing is INFO; unknown sorts last."""
+        findings = [
+            {'id': 1, 'severity': 'LOW'},
+            {'id': 2, 'severity': 'BOGUS'},
+            {'id': 3},
+            {'id': 4, 'severity': 'CRITICAL'},
+            {'id': 5, 'severity': 'LOW'},
+            {'id': 6, 'severity': None},
+        ]
+        
+        result = report_generator._sort_by_severity(findings)
+        
+        assert [f['id'] for f in result] == [4, 1, 5, 3, 2, 6]
 
-    def test_format_hours(self):
-        """Durations under a day should show hours."""
-        assert _format_duration(3600) == '1h'
-        assert _format_duration(7200) == '2h'
-        assert _format_duration(7260) == '2h 1m'
 
-    def test_format_days(self):
-        """Durations over a day should show days."""
-        assert _format_duration(86400) == '1d'
-        assert _format_duration(90000) == '1d 1h'
+class TestFormatDuration:
+    """Tests for duration formatting."""
 
-    def test_format_none(self):
-        """None should return empty string."""
-        assert _format_duration(None) == ''
+    @pytest.mark.parametrize("seconds,expected", [
+        # Durations under a minute should show seconds
+        (30, '30s'),
+        (59, '59s'),
+        # Durations under an hour should show minutes
+        (60, '1m'),
+        (120, '2m'),
+        (3599, '59m'),
+        # Durations under a day should show hours
+        (3600, '1h'),
+        (7200, '2h'),
+        (7260, '2h 1m'),
+        # Durations over a day should show days
+        (86400, '1d'),
+        (90000, '1d 1h'),
+        # None should return empty string
+        (None, ''),
+    ])
+    def test_format_duration(self, seconds, expected):
+        """Durations should use the largest fitting units."""
+        assert _format_duration(seconds) == expected
 
 
 class TestFormatResolution:
     """Tests for resolution formatting."""
 
-    def test_format_true_positive(self):
-        """True positive should have correct class."""
-        result = _format_resolution('true_positive')
-        assert 'res-tp' in result
-        assert 'True Positive' in result
-
-    def test_format_false_positive(self):
-        """False positive should have correct class."""
-        result = _format_resolution('false_positive')
-        assert 'res-fp' in result
-        assert 'False Positive' in result
-
-    def test_format_ignored(self):
-        """Ignored should have correct class."""
-        result = _format_resolution('ignored')
-        assert 'res-ignored' in result
-        assert 'Ignored' in result
-
-    def test_format_none(self):
-        """None should show 'None' with styling."""
-        result = _format_resolution(None)
-        assert 'res-none' in result
-        assert 'None' in result
+    @pytest.mark.parametrize("resolution,css_class,label", [
+        ('true_positive', 'res-tp', 'True Positive'),
+        ('false_positive', 'res-fp', 'False Positive'),
+        ('ignored', 'res-ignored', 'Ignored'),
+        (None, 'res-none', 'None'),
+    ])
+    def test_format_known(self, resolution, css_class, label):
+        """Known resolutions and None should have their styling and label."""
+        result = _format_resolution(resolution)
+        assert css_class in result
+        assert label in result
+
+    def test_format_uppercase(self):
+        """Upper-case API values should map to the same styling."""
+        assert _format_resolution('TRUE_POSITIVE') == _format_resolution('true_positive')
 
     def test_format_unknown(self):
         """Unknown resolutions should be title-cased."""
@@ -326,6 +234,47 @@ class TestFormatResolution:
         assert 'Some Other Status' in result
 
 
+class TestEscape:
+    """Tests for the _escape helper."""
+
+    def test_escape_matches_html_escape(self):
+        """Escaping should match html.escape, including single quotes."""
+        assert _escape("""<a href='x'>"&"</a>""") == \
+            '&lt;a href=&#x27;x&#x27;&gt;&quot;&amp;&quot;&lt;/a&gt;'
+
+    def test_escape_returns_safe_text_unchanged(self):
+        """Text without special characters should be returned as-is."""
+        assert _escape('WORKSTATION-001') == 'WORKSTATION-001'
+
+
+class TestBuildMitreSection:
+    """Tests for MITRE ATT&CK section building."""
+
+    def test_single_entry_inline(self):
+        """A single entry should render inline without a toggle."""
+        mitre_attack = [{'tactic': 'Execution', 'technique': 'PowerShell', 'technique_id': 'T1059.001'}]
+        
+        result = _build_mitre_section(mitre_attack, {})
+        
+        assert 'Execution &rarr; PowerShell (T1059.001)' in result
+        assert 'toggle-mitre' not in result
+
+    def test_multiple_entries_expandable(self):
+        """Multiple entries should render an expandable section."""
+        mitre_attack = [
+            {'tactic': 'Execution', 'technique': 'PowerShell'},
+            {'tactic': '<Persistence>', 'technique': 'Scheduled Task', 'pattern_id': 50015},
+        ]
+        
+        result = _build_mitre_section(mitre_attack, {})
+        
+        assert '+1 more' in result
+        assert '&lt;Persistence&gt;' in result
+        assert '[Pattern: 50015]' in result
+        # Identical entries should render identically on repeat calls
+        assert _build_mitre_section(mitre_attack, {}) == result
+
+
 class TestBuildProcessChain:
     """Tests for process chain building."""
 
@@ -433,6 +382,7 @@ class TestBuildAnalystSummary:
         
         assert 'alice@example.com' in result
         assert 'bob@example.com' in result
+        assert result.index('alice@example.com') < result.index('bob@example.com')
 
     def test_excludes_info_severity(self):
         """INFO severity findings should not count as contradictions."""
